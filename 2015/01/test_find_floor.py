@@ -1,6 +1,13 @@
-from os.path import dirname, join
+from collections.abc import Iterator
+from functools import partial
+from io import BytesIO
+from itertools import accumulate
+from random import Random
+from typing import BinaryIO
 
-from pytest import mark
+from pytest import fixture, mark
+
+from input_loader import puzzle_input_path, read_text
 
 
 def find_floor(directions: str) -> int:
@@ -30,7 +37,92 @@ def first_basement_step(directions: str) -> int | None:
     return None
 
 
-PUZZLE_INPUT = open(join(dirname(__file__), "puzzle_input.txt")).read()
+DEFAULT_CHUNK_SIZE = 1 << 20
+OPEN_BRACKET = ord("(")
+CLOSE_BRACKET = ord(")")
+
+
+def find_floor_streaming(directions: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    current_floor = 0
+
+    for chunk in _read_chunks(directions, chunk_size):
+        current_floor += chunk.count(b"(") - chunk.count(b")")
+
+    return current_floor
+
+
+def first_basement_step_streaming(directions: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int | None:
+    current_floor = 0
+    steps_before_chunk = 0
+
+    for chunk in _read_chunks(directions, chunk_size):
+        # Taking every ")" first bounds the lowest floor cheaply, so only chunks failing it need the exact minimum
+        if current_floor - chunk.count(b")") < 0 and current_floor + _get_lowest_relative_floor(chunk) < 0:
+            return steps_before_chunk + _find_basement_step(chunk, current_floor)
+
+        current_floor += chunk.count(b"(") - chunk.count(b")")
+        steps_before_chunk += len(chunk)
+
+    return None
+
+
+WALK_SIZE = 64
+NON_BRACKETS = bytes(byte for byte in range(256) if byte not in {OPEN_BRACKET, CLOSE_BRACKET})
+STEPS = [0] * 256
+STEPS[OPEN_BRACKET] = 1
+STEPS[CLOSE_BRACKET] = -1
+
+
+def _get_lowest_relative_floor(block: bytes) -> int:
+    brackets = block.translate(None, NON_BRACKETS)
+
+    # Removing a "()" pair never changes the running minimum, so the brackets are reduced with C-level replaces until
+    # a pass stops halving them, and only what is left is walked
+    while len(brackets) > WALK_SIZE:
+        reduced_brackets = brackets.replace(b"()", b"")
+        is_halved = 2 * len(reduced_brackets) <= len(brackets)
+        brackets = reduced_brackets
+
+        if not is_halved:
+            break
+
+    return min(accumulate(map(STEPS.__getitem__, brackets), initial=0))
+
+
+def _find_basement_step(chunk: bytes, current_floor: int) -> int:
+    begin = 0
+    end = len(chunk)
+
+    # Bisect towards the first half that reaches the basement, then walk the small block left over
+    while end - begin > WALK_SIZE:
+        middle = (begin + end) // 2
+        first_half = chunk[begin:middle]
+
+        if current_floor + _get_lowest_relative_floor(first_half) < 0:
+            end = middle
+        else:
+            current_floor += first_half.count(b"(") - first_half.count(b")")
+            begin = middle
+
+    for index in range(begin, end):
+        current_floor += STEPS[chunk[index]]
+
+        if current_floor < 0:
+            return index + 1
+
+    raise RuntimeError(f"Expected to reach the basement in {chunk[begin:end]=}")
+
+
+def _read_chunks(directions: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    return iter(partial(directions.read, chunk_size), b"")
+
+
+PUZZLE_INPUT_PATH = puzzle_input_path(__file__)
+
+
+@fixture
+def puzzle_input() -> str:
+    return read_text(PUZZLE_INPUT_PATH)
 
 
 @mark.parametrize(
@@ -45,13 +137,65 @@ PUZZLE_INPUT = open(join(dirname(__file__), "puzzle_input.txt")).read()
         ("))(", -1),
         (")))", -3),
         (")())())", -3),
-        (PUZZLE_INPUT, 280),
     ],
 )
 def test_find_floor(directions: str, expected_output) -> None:
     assert find_floor(directions) == expected_output
 
 
-@mark.parametrize(("directions", "expected_output"), [("(", None), (")", 1), ("()())", 5), (PUZZLE_INPUT, 1797)])
+@mark.parametrize(("directions", "expected_output"), [("(", None), (")", 1), ("()())", 5)])
 def test_first_basement_step(directions: str, expected_output: int) -> None:
     assert first_basement_step(directions) == expected_output
+
+
+def test_find_floor_puzzle_input(puzzle_input: str) -> None:
+    assert find_floor(puzzle_input) == 280
+
+
+def test_first_basement_step_puzzle_input(puzzle_input: str) -> None:
+    assert first_basement_step(puzzle_input) == 1797
+
+
+@mark.parametrize("chunk_size", [1, 3, 4096])
+@mark.parametrize(("directions", "expected_output"), [("(())", 0), ("(((", 3), ("))(((((", 3), (")())())", -3)])
+def test_find_floor_streaming(directions: str, expected_output: int, chunk_size: int) -> None:
+    assert find_floor_streaming(BytesIO(directions.encode("ascii")), chunk_size) == expected_output
+
+
+@mark.parametrize("chunk_size", [1, 3, 4096])
+@mark.parametrize(("directions", "expected_output"), [("(", None), (")", 1), ("()())", 5), ("((()))())", 9)])
+def test_first_basement_step_streaming(directions: str, expected_output: int | None, chunk_size: int) -> None:
+    assert first_basement_step_streaming(BytesIO(directions.encode("ascii")), chunk_size) == expected_output
+
+
+@mark.parametrize("chunk_size", [1, 100, 1000, DEFAULT_CHUNK_SIZE])
+@mark.parametrize("seed", range(5))
+def test_first_basement_step_streaming_matches_first_basement_step(seed: int, chunk_size: int) -> None:
+    random = Random(seed)
+    # Starting a few floors up keeps the walk near the ground floor for a while before it reaches the basement
+    directions = "(" * random.randint(0, 20) + "".join(random.choices("()()\n", k=20_000))
+    expected_output = first_basement_step(directions)
+
+    assert first_basement_step_streaming(BytesIO(directions.encode("ascii")), chunk_size) == expected_output
+
+
+@mark.parametrize(
+    ("directions", "expected_output"),
+    [
+        ("()" * 100_000 + "))", 200_001),
+        ("(" * 100_000 + ")" * 100_001, 200_001),
+        ("(()" * 50_000 + ")" * 50_001, 200_001),
+        ("(" * 100_000, None),
+    ],
+)
+def test_first_basement_step_streaming_near_ground_floor(directions: str, expected_output: int | None) -> None:
+    assert first_basement_step_streaming(BytesIO(directions.encode("ascii")), chunk_size=1 << 12) == expected_output
+
+
+@mark.parametrize("chunk_size", [7, DEFAULT_CHUNK_SIZE])
+def test_streaming_puzzle_input(chunk_size: int) -> None:
+    with open(PUZZLE_INPUT_PATH, "rb") as directions:
+        assert find_floor_streaming(directions, chunk_size) == 280
+
+    with open(PUZZLE_INPUT_PATH, "rb") as directions:
+        assert first_basement_step_streaming(directions, chunk_size) == 1797
@@ -1,7 +1,11 @@
+from array import array
+from collections.abc import Callable
 from dataclasses import dataclass
-from os.path import dirname, join
+from operator import mul
 
-from pytest import mark
+from pytest import fixture, mark, raises
+
+from input_loader import puzzle_input_path, read_text
 
 
 @dataclass
@@ -47,14 +51,100 @@ def parse_line(line: str) -> Present:
     return Present(int(tokens[0]), int(tokens[1]), int(tokens[2]))
 
 
-PUZZLE_INPUT = open(join(dirname(__file__), "puzzle_input.txt")).read()
+PresentColumns = tuple[array, array, array]
+
+PARSE_BLOCK_SIZE = 1 << 16
+
+
+def calculate_wrapping_paper_columnar(raw_input: str) -> int:
+    lengths, widths, heights = parse_input_columnar(raw_input)
+    side1 = array("q", map(mul, lengths, widths, strict=True))
+    side2 = array("q", map(mul, widths, heights, strict=True))
+    side3 = array("q", map(mul, heights, lengths, strict=True))
+
+    return 2 * (sum(side1) + sum(side2) + sum(side3)) + sum(map(min, side1, side2, side3, strict=True))
+
+
+def calculate_ribbon_columnar(raw_input: str) -> int:
+    lengths, widths, heights = parse_input_columnar(raw_input)
+    longest_sides = sum(map(max, lengths, widths, heights, strict=True))
+    smallest_perimeters = 2 * (sum(lengths) + sum(widths) + sum(heights) - longest_sides)
+    volumes = sum(map(mul, map(mul, lengths, widths, strict=True), heights, strict=True))
+
+    return smallest_perimeters + volumes
+
+
+def parse_input_columnar(raw_input: str) -> PresentColumns:
+    dimensions = array("q")
+    begin = 0
+
+    # Splitting a block of lines at a time keeps only one block's worth of number strings alive alongside the array
+    while begin < len(raw_input):
+        end = raw_input.find("\n", begin + PARSE_BLOCK_SIZE)
+
+        if end == -1:
+            end = len(raw_input)
+
+        dimensions.extend(map(int, raw_input[begin:end].replace("x", " ").split()))
+        begin = end
+
+    if len(dimensions) % 3:
+        raise RuntimeError(f"Expected three dimensions per present, found {len(dimensions)} in total")
+
+    return dimensions[0::3], dimensions[1::3], dimensions[2::3]
 
 
-@mark.parametrize(("raw_input", "expected_output"), [("2x3x4", 58), ("1x1x10", 43), (PUZZLE_INPUT, 1588178)])
+@fixture
+def puzzle_input() -> str:
+    return read_text(puzzle_input_path(__file__))
+
+
+@mark.parametrize(("raw_input", "expected_output"), [("2x3x4", 58), ("1x1x10", 43)])
 def test_wrapping_paper(raw_input: str, expected_output: int) -> None:
     assert calculate_wrapping_paper(raw_input) == expected_output
 
 
-@mark.parametrize(("raw_input", "expected_output"), [("2x3x4", 34), ("1x1x10", 14), (PUZZLE_INPUT, 3783758)])
+@mark.parametrize(("raw_input", "expected_output"), [("2x3x4", 34), ("1x1x10", 14)])
 def test_ribbon(raw_input: str, expected_output: int) -> None:
     assert calculate_ribbon(raw_input) == expected_output
+
+
+@mark.parametrize(("raw_input", "expected_output"), [("2x3x4", 58), ("1x1x10", 43)])
+def test_wrapping_paper_columnar(raw_input: str, expected_output: int) -> None:
+    assert calculate_wrapping_paper_columnar(raw_input) == expected_output
+
+
+@mark.parametrize(("raw_input", "expected_output"), [("2x3x4", 34), ("1x1x10", 14)])
+def test_ribbon_columnar(raw_input: str, expected_output: int) -> None:
+    assert calculate_ribbon_columnar(raw_input) == expected_output
+
+
+@mark.parametrize(
+    ("calculate", "expected_output"),
+    [
+        (calculate_wrapping_paper, 1588178),
+        (calculate_ribbon, 3783758),
+        (calculate_wrapping_paper_columnar, 1588178),
+        (calculate_ribbon_columnar, 3783758),
+    ],
+)
+def test_puzzle_input(puzzle_input: str, calculate: Callable[[str], int], expected_output: int) -> None:
+    assert calculate(puzzle_input) == expected_output
+
+
+def test_parse_input_columnar() -> None:
+    assert parse_input_columnar("2x3x4\n1x1x10") == (array("q", [2, 1]), array("q", [3, 1]), array("q", [4, 10]))
+
+
+def test_parse_input_columnar_across_blocks() -> None:
+    raw_input = "\n".join(f"{index}x{index + 1}x{index + 2}" for index in range(20_000))
+    assert parse_input_columnar(raw_input) == (
+        array("q", range(20_000)),
+        array("q", range(1, 20_001)),
+        array("q", range(2, 20_002)),
+    )
+
+
+def test_parse_input_columnar_rejects_incomplete_present() -> None:
+    with raises(RuntimeError):
+        parse_input_columnar("2x3x4\n1x1")
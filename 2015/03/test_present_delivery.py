@@ -1,7 +1,12 @@
+from collections.abc import Callable
 from dataclasses import dataclass
-from os.path import dirname, join
+from functools import partial
+from itertools import accumulate
+from random import Random
 
-from pytest import mark
+from pytest import fixture, mark, raises
+
+from input_loader import puzzle_input_path, read_text
 
 
 @dataclass(frozen=True)
@@ -50,14 +55,102 @@ def update_position(current_pos: Coord, direction: str) -> Coord:
         raise RuntimeError(f"Unexpected {direction=}")
 
 
-PUZZLE_INPUT = open(join(dirname(__file__), "puzzle_input.txt")).read()
+# Positions are packed into a single int as x + y * ROW_STRIDE, which is unique while |x| < ROW_STRIDE / 2.
+ROW_STRIDE = 1 << 32
+PACKED_STEPS = {"^": -ROW_STRIDE, ">": 1, "v": ROW_STRIDE, "<": -1}
+
+
+def present_delivery_with_couriers(directions: str, num_couriers: int) -> int:
+    if unexpected_directions := set(directions) - PACKED_STEPS.keys():
+        raise RuntimeError(f"Unexpected {unexpected_directions=}")
+
+    visited_houses = {0}
+
+    for courier in range(num_couriers):
+        visited_houses.update(accumulate(map(PACKED_STEPS.__getitem__, directions[courier::num_couriers])))
+
+    return len(visited_houses)
+
+
+def _count_houses_with_coord_set(directions: str, num_couriers: int) -> int:
+    visited_houses = {Coord(0, 0)}
+    positions = [Coord(0, 0)] * num_couriers
+
+    for index, direction in enumerate(directions):
+        positions[index % num_couriers] = update_position(positions[index % num_couriers], direction)
+        visited_houses.add(positions[index % num_couriers])
+
+    return len(visited_houses)
+
+
+def _generate_directions(length: int, seed: int) -> str:
+    return "".join(Random(seed).choices("^>v<", k=length))
+
+
+BENCHMARK_LENGTH = 10_000
 
 
-@mark.parametrize(("directions", "expected_output"), [(">", 2), ("^>v<", 4), ("^v^v^v^v^v", 2), (PUZZLE_INPUT, 2565)])
+@fixture
+def puzzle_input() -> str:
+    return read_text(puzzle_input_path(__file__))
+
+
+@mark.parametrize(("directions", "expected_output"), [(">", 2), ("^>v<", 4), ("^v^v^v^v^v", 2)])
 def test_present_delivery(directions: str, expected_output: int) -> None:
     assert present_delivery(directions) == expected_output
 
 
-@mark.parametrize(("directions", "expected_output"), [("^v", 3), ("^>v<", 3), ("^v^v^v^v^v", 11), (PUZZLE_INPUT, 2639)])
+@mark.parametrize(("directions", "expected_output"), [("^v", 3), ("^>v<", 3), ("^v^v^v^v^v", 11)])
 def test_present_delivery_with_robot(directions: str, expected_output: int) -> None:
     assert present_delivery_with_robot(directions) == expected_output
+
+
+def test_present_delivery_puzzle_input(puzzle_input: str) -> None:
+    assert present_delivery(puzzle_input) == 2565
+    assert present_delivery_with_robot(puzzle_input) == 2639
+
+
+@mark.parametrize("num_couriers", [1, 2, 3, 8])
+@mark.parametrize("directions", [">", "^>v<", "^v^v^v^v^v"])
+def test_present_delivery_with_couriers_matches_coord_set(directions: str, num_couriers: int) -> None:
+    assert present_delivery_with_couriers(directions, num_couriers) == _count_houses_with_coord_set(
+        directions, num_couriers
+    )
+
+
+@mark.parametrize("num_couriers", [3, 8])
+def test_present_delivery_with_couriers_matches_coord_set_puzzle_input(puzzle_input: str, num_couriers: int) -> None:
+    assert present_delivery_with_couriers(puzzle_input, num_couriers) == _count_houses_with_coord_set(
+        puzzle_input, num_couriers
+    )
+
+
+@mark.parametrize(("num_couriers", "expected_output"), [(1, 2565), (2, 2639)])
+def test_present_delivery_with_couriers(puzzle_input: str, num_couriers: int, expected_output: int) -> None:
+    assert present_delivery_with_couriers(puzzle_input, num_couriers) == expected_output
+
+
+def test_present_delivery_with_couriers_rejects_unknown_direction() -> None:
+    with raises(RuntimeError):
+        present_delivery_with_couriers("^x", 1)
+
+
+@fixture(scope="module")
+def benchmark_directions(benchmark_scale: int) -> str:
+    return _generate_directions(BENCHMARK_LENGTH * benchmark_scale, seed=0)
+
+
+@mark.benchmark
+@mark.parametrize(
+    "deliver",
+    [
+        present_delivery,
+        present_delivery_with_robot,
+        partial(present_delivery_with_couriers, num_couriers=1),
+        partial(present_delivery_with_couriers, num_couriers=2),
+    ],
+    ids=["coord_set", "coord_set_with_robot", "packed_1_courier", "packed_2_couriers"],
+)
+def test_benchmark_present_delivery(benchmark_directions: str, deliver: Callable[[str], int]) -> None:
+    # Every courier starts on the shared origin, so the houses visited can't exceed one per step plus the origin
+    assert 1 < deliver(benchmark_directions) <= len(benchmark_directions) + 1
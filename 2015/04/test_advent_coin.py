@@ -1,4 +1,6 @@
+from concurrent.futures import ProcessPoolExecutor
 from hashlib import md5
+from os import cpu_count
 
 from pytest import mark
 
@@ -17,9 +19,72 @@ def get_advent_coin(secret_key: str, num_leading_zeros: int) -> int:
         number_to_check += 1
 
 
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+
+def get_advent_coin_parallel(
+    secret_key: str, num_leading_zeros: int, max_workers: int | None = None, block_size: int = DEFAULT_BLOCK_SIZE
+) -> int:
+    num_workers = max_workers or cpu_count() or 1
+    batch_size = num_workers * block_size
+    batch_start = 1
+
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        while True:
+            block_starts = range(batch_start, batch_start + batch_size, block_size)
+            # map yields in submission order, so the first hit is the smallest regardless of which worker finished first
+            results = executor.map(
+                _mine_block,
+                [secret_key] * num_workers,
+                [num_leading_zeros] * num_workers,
+                block_starts,
+                [block_size] * num_workers,
+            )
+
+            for result in results:
+                if result is not None:
+                    return result
+
+            batch_start += batch_size
+
+
+def _mine_block(secret_key: str, num_leading_zeros: int, block_start: int, block_size: int) -> int | None:
+    prefix_hash = md5(secret_key.encode("ascii"))
+    num_zero_bytes, has_zero_nibble = divmod(num_leading_zeros, 2)
+    zero_bytes = bytes(num_zero_bytes)
+
+    for number_to_check in range(block_start, block_start + block_size):
+        hash = prefix_hash.copy()
+        hash.update(str(number_to_check).encode("ascii"))
+        digest = hash.digest()
+
+        if digest[:num_zero_bytes] == zero_bytes and (not has_zero_nibble or digest[num_zero_bytes] < 0x10):
+            return number_to_check
+
+    return None
+
+
 @mark.parametrize(
     ("secret_key", "num_leading_zeros", "expected_output"),
     [("abcdef", 5, 609043), ("pqrstuv", 5, 1048970), ("yzbqklnj", 5, 282749), ("yzbqklnj", 6, 9962624)],
 )
 def test_advent_coin(secret_key: str, num_leading_zeros: int, expected_output: int) -> None:
     assert get_advent_coin(secret_key, num_leading_zeros) == expected_output
+
+
+@mark.parametrize(
+    ("secret_key", "num_leading_zeros", "expected_output"),
+    [("abcdef", 5, 609043), ("pqrstuv", 5, 1048970), ("yzbqklnj", 5, 282749), ("yzbqklnj", 6, 9962624)],
+)
+def test_advent_coin_parallel(secret_key: str, num_leading_zeros: int, expected_output: int) -> None:
+    assert get_advent_coin_parallel(secret_key, num_leading_zeros) == expected_output
+
+
+@mark.parametrize(("max_workers", "block_size"), [(1, 1000), (3, 777), (8, 1 << 12)])
+def test_advent_coin_parallel_is_independent_of_sharding(max_workers: int, block_size: int) -> None:
+    assert get_advent_coin_parallel("abcdef", 5, max_workers, block_size) == 609043
+
+
+@mark.parametrize(("number_to_check", "num_leading_zeros", "expected_output"), [(609043, 5, 609043), (609043, 6, None)])
+def test_mine_block(number_to_check: int, num_leading_zeros: int, expected_output: int | None) -> None:
+    assert _mine_block("abcdef", num_leading_zeros, number_to_check, 1) == expected_output
@@ -1,8 +1,12 @@
+import re
 from collections import defaultdict
 from collections.abc import Callable
-from os.path import dirname, join
+from functools import partial
+from random import Random
 
-from pytest import mark
+from pytest import fixture, mark
+
+from input_loader import puzzle_input_path, read_text
 
 BANNED_STRINGS = {"ab", "cd", "pq", "xy"}
 VOWELS = {"a", "e", "i", "o", "u"}
@@ -52,6 +56,26 @@ def count_nice_strings(raw_input: str, func: Callable[[str], bool]) -> int:
     return sum(1 if func(line) else 0 for line in raw_input.splitlines())
 
 
+NICE_STRINGS_PATTERN = re.compile(
+    r"""^
+    (?P<nice>(?=(?:[^aeiou\n]*[aeiou]){3})(?=.*(?P<repeat>.)(?P=repeat))(?!.*(?:ab|cd|pq|xy)))?
+    (?P<nice2>(?=.*(?P<pair>..).*(?P=pair))(?=.*(?P<letter>.).(?P=letter)))?
+    .*$""",
+    re.MULTILINE | re.VERBOSE,
+)
+
+
+def count_nice_strings_batch(raw_input: str) -> tuple[int, int]:
+    nice_count = 0
+    nice2_count = 0
+
+    for match in NICE_STRINGS_PATTERN.finditer(raw_input):
+        nice_count += match["nice"] is not None
+        nice2_count += match["nice2"] is not None
+
+    return nice_count, nice2_count
+
+
 @mark.parametrize(
     ("s", "expected_output"),
     [
@@ -74,12 +98,73 @@ def test_is_string_nice2(s: str, expected_output: bool) -> None:
     assert is_string_nice2(s) == expected_output
 
 
-PUZZLE_INPUT = open(join(dirname(__file__), "puzzle_input.txt")).read()
+def _generate_corpus(num_lines: int, seed: int, word_length: int = 16) -> str:
+    random = Random(seed)
+    # A small alphabet makes repeated letters and pairs, and so nice strings under both rules, reasonably common
+    return "\n".join("".join(random.choices("abcdehijkopqxy", k=word_length)) for _ in range(num_lines))
 
 
-def test_count_nice_strings():
-    assert count_nice_strings(PUZZLE_INPUT, is_string_nice) == 255
+BENCHMARK_NUM_LINES = 1_000
 
 
-def test_count_nice_strings2():
-    assert count_nice_strings(PUZZLE_INPUT, is_string_nice2) == 55
+@fixture
+def puzzle_input() -> str:
+    return read_text(puzzle_input_path(__file__))
+
+
+def test_count_nice_strings(puzzle_input: str):
+    assert count_nice_strings(puzzle_input, is_string_nice) == 255
+
+
+def test_count_nice_strings2(puzzle_input: str):
+    assert count_nice_strings(puzzle_input, is_string_nice2) == 55
+
+
+@mark.parametrize(
+    "s",
+    [
+        "ugknbfddgicrmopn",
+        "aaa",
+        "jchzalrnumimnmhp",
+        "haegwjzuvuyypxyu",
+        "dvszwmarrgswjxmb",
+        "qjhvhtzxzqqjkmpb",
+        "xxyxx",
+        "uurcxstgmygtbstg",
+        "ieodomkazucvgmuy",
+        "aaaa",
+    ],
+)
+def test_count_nice_strings_batch_single_line(s: str) -> None:
+    assert count_nice_strings_batch(s) == (int(is_string_nice(s)), int(is_string_nice2(s)))
+
+
+def test_count_nice_strings_batch(puzzle_input: str):
+    assert count_nice_strings_batch(puzzle_input) == (255, 55)
+
+
+def test_count_nice_strings_batch_generated_corpus() -> None:
+    corpus = _generate_corpus(2_000, seed=1)
+    expected_output = (count_nice_strings(corpus, is_string_nice), count_nice_strings(corpus, is_string_nice2))
+
+    assert 0 not in expected_output
+    assert count_nice_strings_batch(corpus) == expected_output
+
+
+@fixture(scope="module")
+def benchmark_corpus(benchmark_scale: int) -> str:
+    return _generate_corpus(BENCHMARK_NUM_LINES * benchmark_scale, seed=0)
+
+
+@mark.benchmark
+@mark.parametrize(
+    "count_nice",
+    [
+        partial(count_nice_strings, func=is_string_nice),
+        partial(count_nice_strings, func=is_string_nice2),
+        count_nice_strings_batch,
+    ],
+    ids=["is_string_nice", "is_string_nice2", "batch"],
+)
+def test_benchmark_count_nice_strings(benchmark_corpus: str, count_nice: Callable[[str], object]) -> None:
+    count_nice(benchmark_corpus)
@@ -1,8 +1,11 @@
+from bisect import bisect_left
 from collections.abc import Callable, Mapping
 from dataclasses import dataclass
-from os.path import dirname, join
+from itertools import pairwise
 
-from pytest import fixture, raises
+from pytest import fixture, mark, raises
+
+from input_loader import iter_lines, puzzle_input_path
 
 
 @dataclass
@@ -86,6 +89,33 @@ def parse_range(text: str) -> Range:
     )
 
 
+def total_brightness_compressed(instructions: list[str], command_map: Mapping[str, Callable]) -> int:
+    commands = [parse_instruction(instruction, command_map) for instruction in instructions]
+    # Every instruction edge becomes a boundary, so each compressed cell is covered by an instruction either
+    # entirely or not at all.
+    ranges = [apply_range for _, apply_range in commands]
+    x_boundaries = sorted({bound for r in ranges for bound in (r.begin.x, r.end.x + 1)})
+    y_boundaries = sorted({bound for r in ranges for bound in (r.begin.y, r.end.y + 1)})
+    # Lights outside every instruction are never counted, so they must all start off, which is 0 for either command map
+    cells = [[0] * (len(x_boundaries) - 1) for _ in range(len(y_boundaries) - 1)]
+
+    for command, apply_range in commands:
+        x_begin = bisect_left(x_boundaries, apply_range.begin.x)
+        x_end = bisect_left(x_boundaries, apply_range.end.x + 1)
+        y_begin = bisect_left(y_boundaries, apply_range.begin.y)
+        y_end = bisect_left(y_boundaries, apply_range.end.y + 1)
+
+        for row in cells[y_begin:y_end]:
+            row[x_begin:x_end] = map(command, row[x_begin:x_end])
+
+    widths = [end - begin for begin, end in pairwise(x_boundaries)]
+
+    return sum(
+        (y_end - y_begin) * sum(int(value) * width for value, width in zip(row, widths, strict=True))
+        for (y_begin, y_end), row in zip(pairwise(y_boundaries), cells, strict=True)
+    )
+
+
 def test_turn_on_instruction_turns_on_previously_off_lights():
     instruction = "turn on 0,0 through 0,0"
     lights = [[False]]
@@ -148,7 +178,7 @@ def test_unknown_instruction_raises():
 
 @fixture
 def puzzle_input() -> list[str]:
-    return open(join(dirname(__file__), "puzzle_input.txt")).read().splitlines()
+    return list(iter_lines(puzzle_input_path(__file__)))
 
 
 def test_apply_instructions(puzzle_input: list[str]) -> None:
@@ -167,3 +197,32 @@ def test_apply_instructions_with_variable_brightness(puzzle_input: list[str]) ->
         process_instruction(instruction, lights, COMMAND_MAP_WITH_VARIABLE_BRIGHTNESS)
 
     assert sum(sum(value for value in row) for row in lights) == 17836115
+
+
+@mark.parametrize(
+    "instructions",
+    [
+        ["turn on 0,0 through 3,3"],
+        ["toggle 1,1 through 2,2", "turn on 0,0 through 1,3", "turn off 2,0 through 2,0"],
+        ["toggle 0,0 through 3,1", "toggle 1,0 through 2,3", "turn off 0,0 through 0,3", "turn off 3,3 through 3,3"],
+    ],
+)
+@mark.parametrize("command_map", [COMMAND_MAP_WITH_FIXED_BRIGHTNESS, COMMAND_MAP_WITH_VARIABLE_BRIGHTNESS])
+def test_total_brightness_compressed_matches_full_grid(
+    instructions: list[str], command_map: Mapping[str, Callable]
+) -> None:
+    lights = [[0 for _ in range(4)] for _ in range(4)]
+
+    for instruction in instructions:
+        process_instruction(instruction, lights, command_map)
+
+    expected_output = sum(sum(int(value) for value in row) for row in lights)
+    assert total_brightness_compressed(instructions, command_map) == expected_output
+
+
+def test_total_brightness_compressed(puzzle_input: list[str]) -> None:
+    assert total_brightness_compressed(puzzle_input, COMMAND_MAP_WITH_FIXED_BRIGHTNESS) == 569999
+
+
+def test_total_brightness_compressed_with_variable_brightness(puzzle_input: list[str]) -> None:
+    assert total_brightness_compressed(puzzle_input, COMMAND_MAP_WITH_VARIABLE_BRIGHTNESS) == 17836115
@@ -1,8 +1,10 @@
-from collections.abc import MutableMapping
+from collections.abc import Callable, MutableMapping
 from dataclasses import dataclass
-from os.path import dirname, join
+from operator import and_, or_, rshift
 
-from pytest import mark
+from pytest import fixture, mark, raises
+
+from input_loader import puzzle_input_path, read_text
 
 Circuit = MutableMapping[str, "Expression"]
 
@@ -86,6 +88,127 @@ def logic_gates(circuit: Circuit, variable: str) -> int:
     return circuit[variable].evaluate(circuit)
 
 
+@dataclass
+class Operation:
+    function: Callable[..., int]
+    operands: tuple[int, ...]
+
+
+class CompiledCircuit:
+    def __init__(self, circuit: Circuit):
+        self._slots = {wire: slot for slot, wire in enumerate(circuit)}
+        self._operations = [Operation(_identity, ()) for _ in circuit]
+
+        for slot, expression in enumerate(circuit.values()):
+            self._operations[slot] = self._compile_expression(expression)
+
+        self._values = [0] * len(self._operations)
+        self._dependants = self._compute_dependants()
+        self._order = self._compute_topological_order()
+        self._positions = {slot: position for position, slot in enumerate(self._order)}
+
+        for slot in self._order:
+            self._evaluate_slot(slot)
+
+    def __getitem__(self, wire: str) -> int:
+        return self._values[self._slots[wire]]
+
+    def override(self, wire: str, value: int) -> None:
+        slot = self._slots[wire]
+        self._operations[slot] = Operation(_constant(value), ())
+
+        for downstream_slot in sorted(self._get_downstream_cone(slot), key=self._positions.__getitem__):
+            self._evaluate_slot(downstream_slot)
+
+    def _compile_expression(self, expression: Expression) -> Operation:
+        match expression:
+            case AndExpression(lhs, rhs):
+                return Operation(and_, (self._compile_operand(lhs), self._compile_operand(rhs)))
+            case ConstantExpression(value):
+                return Operation(_constant(value), ())
+            case LeftShiftExpression(variable, shift):
+                return Operation(_lshift, (self._compile_operand(variable), self._compile_operand(shift)))
+            case NotExpression(underlying):
+                return Operation(_not, (self._compile_operand(underlying),))
+            case OrExpression(lhs, rhs):
+                return Operation(or_, (self._compile_operand(lhs), self._compile_operand(rhs)))
+            case RightShiftExpression(variable, shift):
+                return Operation(rshift, (self._compile_operand(variable), self._compile_operand(shift)))
+            case VariableExpression(underlying):
+                return Operation(_identity, (self._slots[underlying],))
+
+        raise RuntimeError(f"Unexpected {expression=}")
+
+    def _compile_operand(self, expression: Expression) -> int:
+        if isinstance(expression, VariableExpression):
+            return self._slots[expression.underlying]
+
+        # Nested expressions are given anonymous slots after the named wires
+        self._operations.append(Operation(_identity, ()))
+        slot = len(self._operations) - 1
+        self._operations[slot] = self._compile_expression(expression)
+
+        return slot
+
+    def _compute_dependants(self) -> list[list[int]]:
+        dependants: list[list[int]] = [[] for _ in self._operations]
+
+        for slot, operation in enumerate(self._operations):
+            for operand in operation.operands:
+                dependants[operand].append(slot)
+
+        return dependants
+
+    def _compute_topological_order(self) -> list[int]:
+        num_pending_operands = [len(operation.operands) for operation in self._operations]
+        order = [slot for slot, num_pending in enumerate(num_pending_operands) if num_pending == 0]
+
+        for slot in order:
+            for dependant in self._dependants[slot]:
+                num_pending_operands[dependant] -= 1
+
+                if num_pending_operands[dependant] == 0:
+                    order.append(dependant)
+
+        if len(order) != len(self._operations):
+            raise RuntimeError("Circuit contains a cycle")
+
+        return order
+
+    def _evaluate_slot(self, slot: int) -> None:
+        operation = self._operations[slot]
+        self._values[slot] = operation.function(*(self._values[operand] for operand in operation.operands))
+
+    def _get_downstream_cone(self, slot: int) -> set[int]:
+        cone = {slot}
+        pending = [slot]
+
+        while pending:
+            for dependant in self._dependants[pending.pop()]:
+                if dependant not in cone:
+                    cone.add(dependant)
+                    pending.append(dependant)
+
+        return cone
+
+
+def _constant(value: int) -> Callable[[], int]:
+    return lambda: value
+
+
+def _identity(value: int) -> int:
+    return value
+
+
+def _lshift(value: int, shift: int) -> int:
+    # Wires carry 16-bit signals, so bits shifted past the top are dropped
+    return (value << shift) & 0xFFFF
+
+
+def _not(value: int) -> int:
+    return 0xFFFF - value
+
+
 def parse_input(raw_input: str) -> Circuit:
     output = {}
 
@@ -128,7 +251,10 @@ x LSHIFT 2 -> f
 y RSHIFT 2 -> g
 NOT x -> h"""
 
-PUZZLE_INPUT = open(join(dirname(__file__), "puzzle_input.txt")).read()
+
+@fixture
+def puzzle_input() -> str:
+    return read_text(puzzle_input_path(__file__))
 
 
 @mark.parametrize(
@@ -141,7 +267,6 @@ PUZZLE_INPUT = open(join(dirname(__file__), "puzzle_input.txt")).read()
         (EXAMPLE_INPUT, "f", 492),
         (EXAMPLE_INPUT, "g", 114),
         (EXAMPLE_INPUT, "h", 65412),
-        (PUZZLE_INPUT, "a", 3176),
     ],
 )
 def test_logic_gates(raw_input: str, variable: str, expected_value: int) -> None:
@@ -149,7 +274,72 @@ def test_logic_gates(raw_input: str, variable: str, expected_value: int) -> None
     assert logic_gates(circuit, variable) == expected_value
 
 
-def test_logic_gates_with_overriden_b() -> None:
-    circuit = parse_input(PUZZLE_INPUT)
+def test_logic_gates_puzzle_input(puzzle_input: str) -> None:
+    assert logic_gates(parse_input(puzzle_input), "a") == 3176
+
+
+def test_logic_gates_with_overriden_b(puzzle_input: str) -> None:
+    circuit = parse_input(puzzle_input)
     circuit["b"] = ConstantExpression(3176)
     assert logic_gates(circuit, "a") == 14710
+
+
+@mark.parametrize(
+    ("raw_input", "variable", "expected_value"),
+    [
+        (EXAMPLE_INPUT, "x", 123),
+        (EXAMPLE_INPUT, "y", 456),
+        (EXAMPLE_INPUT, "d", 72),
+        (EXAMPLE_INPUT, "e", 507),
+        (EXAMPLE_INPUT, "f", 492),
+        (EXAMPLE_INPUT, "g", 114),
+        (EXAMPLE_INPUT, "h", 65412),
+    ],
+)
+def test_compiled_circuit(raw_input: str, variable: str, expected_value: int) -> None:
+    compiled_circuit = CompiledCircuit(parse_input(raw_input))
+    assert compiled_circuit[variable] == expected_value
+
+
+def test_compiled_circuit_puzzle_input(puzzle_input: str) -> None:
+    assert CompiledCircuit(parse_input(puzzle_input))["a"] == 3176
+
+
+def test_compiled_circuit_with_overriden_b(puzzle_input: str) -> None:
+    compiled_circuit = CompiledCircuit(parse_input(puzzle_input))
+    compiled_circuit.override("b", compiled_circuit["a"])
+    assert compiled_circuit["a"] == 14710
+
+
+def test_compiled_circuit_override_only_changes_downstream_wires() -> None:
+    compiled_circuit = CompiledCircuit(parse_input(EXAMPLE_INPUT))
+    compiled_circuit.override("x", 0xFFFF)
+
+    assert [compiled_circuit[wire] for wire in ["x", "y", "d", "e", "f", "g", "h"]] == [
+        0xFFFF,
+        456,
+        456,
+        0xFFFF,
+        0xFFFC,
+        114,
+        0,
+    ]
+
+
+def test_compiled_circuit_with_nested_expressions() -> None:
+    circuit: Circuit = {
+        "x": NotExpression(AndExpression(ConstantExpression(12), VariableExpression("y"))),
+        "y": ConstantExpression(10),
+    }
+    assert CompiledCircuit(circuit)["x"] == 0xFFFF - 8
+
+
+def test_compiled_circuit_handles_deep_circuits() -> None:
+    raw_input = "\n".join(["1 -> w0", *(f"NOT w{index} -> w{index + 1}" for index in range(100_000))])
+    compiled_circuit = CompiledCircuit(parse_input(raw_input))
+    assert compiled_circuit["w100000"] == 1
+
+
+def test_compiled_circuit_rejects_cycles() -> None:
+    with raises(RuntimeError):
+        CompiledCircuit(parse_input("x -> y\ny -> x"))
@@ -1,7 +1,11 @@
+import re
+from collections.abc import Callable
 from enum import Enum
-from os.path import dirname, join
+from random import Random
 
-from pytest import mark
+from pytest import fixture, mark, raises
+
+from input_loader import puzzle_input_path, read_text
 
 
 class State(Enum):
@@ -83,6 +87,42 @@ def get_difference_of_encoded_string(raw_input: str) -> int:
     return sum(get_length_of_encoded_string(s) - len(s) for s in raw_input.splitlines())
 
 
+ESCAPE_SEQUENCE_REGEX = re.compile(r"\\(?:x..|.)")
+
+
+def get_differences_bulk(raw_input: str) -> tuple[int, int]:
+    # Every line must hold a string literal, otherwise the two quotes per line would be miscounted
+    if raw_input.startswith("\n") or "\n\n" in raw_input:
+        raise RuntimeError("Unexpected blank line")
+
+    num_strings = _count_lines(raw_input)
+    escape_sequences = ESCAPE_SEQUENCE_REGEX.findall(raw_input)
+    # Each escape sequence decodes to a single character
+    decoded_difference = 2 * num_strings + sum(map(len, escape_sequences)) - len(escape_sequences)
+    encoded_difference = 2 * num_strings + raw_input.count('"') + raw_input.count("\\")
+
+    return decoded_difference, encoded_difference
+
+
+def _count_lines(raw_input: str) -> int:
+    if not raw_input:
+        return 0
+
+    return raw_input.count("\n") + (0 if raw_input.endswith("\n") else 1)
+
+
+def _generate_strings(num_lines: int, seed: int, max_length: int = 32) -> str:
+    random = Random(seed)
+    # Plain characters mixed with every kind of escape sequence the puzzle allows
+    pieces = ["a", "b", "z", "0", '\\"', "\\\\", "\\x27", "\\xaf"]
+    return "\n".join(
+        '"' + "".join(random.choices(pieces, k=random.randint(0, max_length))) + '"' for _ in range(num_lines)
+    )
+
+
+BENCHMARK_NUM_LINES = 1_000
+
+
 @mark.parametrize(
     ("input_string", "expected_length"),
     [('""', 0), ('"A"', 1), ('"A\\"A"', 3), ('"abc"', 3), ('"aaa\\"aaa"', 7), ('"\\x27"', 1)],
@@ -101,14 +141,59 @@ EXAMPLE_INPUT = '''""
 "aaa\\"aaa"
 "\\x27"'''
 
-PUZZLE_INPUT = open(join(dirname(__file__), "puzzle_input.txt")).read()
 
+@fixture
+def puzzle_input() -> str:
+    return read_text(puzzle_input_path(__file__))
 
-@mark.parametrize(("raw_input", "expected_difference"), [(EXAMPLE_INPUT, 12), (PUZZLE_INPUT, 1371)])
+
+@mark.parametrize(("raw_input", "expected_difference"), [(EXAMPLE_INPUT, 12)])
 def test_get_difference_of_decoded_string(raw_input: str, expected_difference: int) -> None:
     assert get_difference_of_decoded_string(raw_input) == expected_difference
 
 
-@mark.parametrize(("raw_input", "expected_difference"), [(EXAMPLE_INPUT, 19), (PUZZLE_INPUT, 2117)])
+@mark.parametrize(("raw_input", "expected_difference"), [(EXAMPLE_INPUT, 19)])
 def test_get_difference_of_encoded_string(raw_input: str, expected_difference: int) -> None:
     assert get_difference_of_encoded_string(raw_input) == expected_difference
+
+
+@mark.parametrize(
+    ("raw_input", "expected_differences"),
+    [("", (0, 0)), ('"\\\\x27"\n', (3, 6)), (EXAMPLE_INPUT, (12, 19))],
+)
+def test_get_differences_bulk(raw_input: str, expected_differences: tuple[int, int]) -> None:
+    assert get_differences_bulk(raw_input) == expected_differences
+
+
+@mark.parametrize("raw_input", ["\n", '""\n\n"a"', '"a"\n\n'])
+def test_get_differences_bulk_rejects_blank_lines(raw_input: str) -> None:
+    with raises(RuntimeError):
+        get_differences_bulk(raw_input)
+
+
+def test_get_differences_bulk_generated_strings() -> None:
+    raw_input = _generate_strings(2_000, seed=1)
+    expected_differences = (get_difference_of_decoded_string(raw_input), get_difference_of_encoded_string(raw_input))
+
+    assert get_differences_bulk(raw_input) == expected_differences
+
+
+def test_puzzle_input(puzzle_input: str) -> None:
+    assert get_difference_of_decoded_string(puzzle_input) == 1371
+    assert get_difference_of_encoded_string(puzzle_input) == 2117
+    assert get_differences_bulk(puzzle_input) == (1371, 2117)
+
+
+@fixture(scope="module")
+def benchmark_strings(benchmark_scale: int) -> str:
+    return _generate_strings(BENCHMARK_NUM_LINES * benchmark_scale, seed=0)
+
+
+@mark.benchmark
+@mark.parametrize(
+    "get_differences",
+    [get_difference_of_decoded_string, get_difference_of_encoded_string, get_differences_bulk],
+    ids=["decoded", "encoded", "bulk"],
+)
+def test_benchmark_differences(benchmark_strings: str, get_differences: Callable[[str], object]) -> None:
+    get_differences(benchmark_strings)
@@ -1,9 +1,14 @@
+from array import array
 from collections import defaultdict
-from collections.abc import Mapping, MutableMapping
+from collections.abc import Callable, Mapping, MutableMapping
 from dataclasses import dataclass
 from heapq import heapify, heappop, heappush
+from itertools import accumulate, compress, pairwise, permutations
+from math import inf
+from operator import add, not_
+from random import Random
 
-from pytest import mark
+from pytest import fixture, mark
 
 Distances = Mapping[str, Mapping[str, int]]
 MutableDistances = MutableMapping[str, MutableMapping[str, int]]
@@ -48,6 +53,122 @@ def find_distance(distances: Distances, longest: bool) -> int | None:
     return None
 
 
+def find_distance_held_karp(distances: Distances, longest: bool) -> int | None:
+    route = find_route_held_karp(distances, longest)
+    return None if route is None else route.distance
+
+
+def find_route_held_karp(distances: Distances, longest: bool) -> QueueItem | None:
+    cities = sorted(distances.keys())
+    num_cities = len(cities)
+
+    if num_cities == 0:
+        return None
+
+    if num_cities == 1:
+        return QueueItem(0, (cities[0],))
+
+    # Longest paths are found by minimising negated distances, with missing legs left at infinity
+    sign = -1 if longest else 1
+    legs_into = [
+        [sign * distances[source][target] if target in distances[source] else inf for source in cities]
+        for target in cities
+    ]
+    full_mask = (1 << num_cities) - 1
+    city_bits = [1 << city for city in range(num_cities)]
+    lower_bits = [bit - 1 for bit in city_bits]
+    # Legs are as long both ways, so a route is a path over the first half of its cities joined to a reversed path over
+    # the rest, and paths over more than half of the cities are never needed
+    first_half_size = num_cities // 2
+    second_half_size = num_cities - first_half_size
+    # best_distances holds one row per visited_mask of at most second_half_size cities, with the best distance of a path
+    # over visited_mask ending at each city in it in order, so the row of visited_mask starts at
+    # row_starts[visited_mask] and has one entry per set bit
+    row_starts = array(
+        "q",
+        accumulate(
+            (mask.bit_count() if mask.bit_count() <= second_half_size else 0 for mask in range(full_mask + 1)),
+            initial=0,
+        ),
+    )
+    best_distances = array("d", [inf]) * row_starts[-1]
+
+    for bit in city_bits:
+        best_distances[row_starts[bit]] = 0
+
+    for visited_mask in range(1, full_mask):
+        if visited_mask.bit_count() >= second_half_size:
+            continue
+
+        path_ends = _get_path_ends(best_distances, row_starts, visited_mask)
+        visited = [visited_mask & bit for bit in city_bits]
+
+        # Each path is extended to every city it has not visited, through the legs from the cities it can end at
+        for city in compress(range(num_cities), map(not_, visited)):
+            next_mask = visited_mask | city_bits[city]
+            best_distances[row_starts[next_mask] + (visited_mask & lower_bits[city]).bit_count()] = min(
+                map(add, path_ends, compress(legs_into[city], visited), strict=True)
+            )
+
+    best_distance, best_first_half, best_join_city = inf, 0, 0
+
+    for first_half in range(full_mask + 1):
+        # With equal halves every split would be seen twice, so the first city is kept in the first half
+        if first_half.bit_count() != first_half_size or (first_half_size == second_half_size and not first_half & 1):
+            continue
+
+        first_path_ends = _get_path_ends(best_distances, row_starts, first_half)
+        second_path_ends = _get_path_ends(best_distances, row_starts, full_mask ^ first_half)
+        visited = [first_half & bit for bit in city_bits]
+
+        for join_city, second_distance in zip(
+            compress(range(num_cities), map(not_, visited)), second_path_ends, strict=True
+        ):
+            distance = second_distance + min(
+                map(add, first_path_ends, compress(legs_into[join_city], visited), strict=True)
+            )
+
+            if distance < best_distance:
+                best_distance, best_first_half, best_join_city = distance, first_half, join_city
+
+    if best_distance == inf:
+        return None
+
+    first_end = _get_previous_city(best_distances, row_starts, legs_into, best_first_half, best_join_city)
+    first_path = _reconstruct_path(best_distances, row_starts, legs_into, best_first_half, first_end)
+    second_path = _reconstruct_path(best_distances, row_starts, legs_into, full_mask ^ best_first_half, best_join_city)
+    path = first_path + second_path[::-1]
+
+    return QueueItem(sign * int(best_distance), tuple(cities[city] for city in path))
+
+
+def _get_path_ends(best_distances: array[float], row_starts: array[int], visited_mask: int) -> array[float]:
+    return best_distances[row_starts[visited_mask] : row_starts[visited_mask + 1]]
+
+
+def _get_previous_city(
+    best_distances: array[float], row_starts: array[int], legs_into: list[list[float]], visited_mask: int, city: int
+) -> int:
+    previous_cities = [previous for previous in range(visited_mask.bit_length()) if visited_mask >> previous & 1]
+    path_ends = _get_path_ends(best_distances, row_starts, visited_mask)
+    distances = list(map(add, path_ends, (legs_into[city][previous] for previous in previous_cities), strict=True))
+
+    return previous_cities[distances.index(min(distances))]
+
+
+def _reconstruct_path(
+    best_distances: array[float], row_starts: array[int], legs_into: list[list[float]], visited_mask: int, city: int
+) -> list[int]:
+    path = [city]
+
+    while visited_mask != 1 << city:
+        visited_mask ^= 1 << city
+        city = _get_previous_city(best_distances, row_starts, legs_into, visited_mask, city)
+        path.append(city)
+
+    return path[::-1]
+
+
 def parse_input(raw_input: str) -> Distances:
     output: MutableDistances = defaultdict(lambda: defaultdict(int))
 
@@ -62,6 +183,23 @@ def parse_input(raw_input: str) -> Distances:
     return output
 
 
+def _generate_complete_graph(num_cities: int, seed: int) -> Distances:
+    random = Random(seed)
+    cities = [f"City{index}" for index in range(num_cities)]
+    distances: MutableDistances = defaultdict(dict)
+
+    for index, source in enumerate(cities):
+        for target in cities[index + 1 :]:
+            distances[source][target] = distances[target][source] = random.randint(1, 100)
+
+    return distances
+
+
+# The heap search grows factorially with the number of cities, so only the logarithm of the scale is added. Held-Karp
+# alone takes about 0.9 s and 26 MB at 16 cities, 3.6 s and 34 MB at 18 and 20 s and 71 MB at 20
+BENCHMARK_NUM_CITIES = 5
+
+
 EXAMPLE_INPUT = """London to Dublin = 464
 London to Belfast = 518
 Dublin to Belfast = 141"""
@@ -104,3 +242,63 @@ def test_get_shortest_distance(raw_input: str, expected_output: int) -> None:
 @mark.parametrize(("raw_input", "expected_output"), [(EXAMPLE_INPUT, 982), (PUZZLE_INPUT, 736)])
 def test_get_longest_distance(raw_input: str, expected_output: int) -> None:
     assert get_distance(raw_input, longest=True) == expected_output
+
+
+@mark.parametrize(("raw_input", "expected_output"), [(EXAMPLE_INPUT, 605), (PUZZLE_INPUT, 141)])
+def test_get_shortest_distance_held_karp(raw_input: str, expected_output: int) -> None:
+    assert find_distance_held_karp(parse_input(raw_input), longest=False) == expected_output
+
+
+@mark.parametrize(("raw_input", "expected_output"), [(EXAMPLE_INPUT, 982), (PUZZLE_INPUT, 736)])
+def test_get_longest_distance_held_karp(raw_input: str, expected_output: int) -> None:
+    assert find_distance_held_karp(parse_input(raw_input), longest=True) == expected_output
+
+
+@mark.parametrize("longest", [False, True])
+@mark.parametrize("raw_input", [EXAMPLE_INPUT, PUZZLE_INPUT])
+def test_find_route_held_karp_path_has_reported_distance(raw_input: str, longest: bool) -> None:
+    distances = parse_input(raw_input)
+    route = find_route_held_karp(distances, longest)
+
+    assert route is not None
+    assert sorted(route.path) == sorted(distances.keys())
+    assert sum(distances[source][target] for source, target in pairwise(route.path)) == route.distance
+
+
+@mark.parametrize("seed", range(5))
+def test_held_karp_matches_permutations(seed: int) -> None:
+    random = Random(seed)
+    cities = [f"City{index}" for index in range(7)]
+    distances: MutableDistances = defaultdict(dict)
+
+    for index, source in enumerate(cities):
+        for target in cities[index + 1 :]:
+            if random.random() < 0.8:
+                distances[source][target] = distances[target][source] = random.randint(1, 100)
+
+    route_distances = [
+        sum(distances[source][target] for source, target in pairwise(path))
+        for path in permutations(cities)
+        if all(target in distances[source] for source, target in pairwise(path))
+    ]
+
+    assert find_distance_held_karp(distances, longest=False) == min(route_distances, default=None)
+    assert find_distance_held_karp(distances, longest=True) == max(route_distances, default=None)
+
+
+def test_held_karp_without_any_route() -> None:
+    distances: MutableDistances = {"A": {"B": 1}, "B": {"A": 1}, "C": {}}
+    assert find_route_held_karp(distances, longest=False) is None
+
+
+@fixture(scope="module")
+def benchmark_distances(benchmark_scale: int) -> Distances:
+    return _generate_complete_graph(BENCHMARK_NUM_CITIES + benchmark_scale.bit_length(), seed=0)
+
+
+@mark.benchmark
+@mark.parametrize("find", [find_distance, find_distance_held_karp], ids=["heap", "held_karp"])
+def test_benchmark_shortest_distance(
+    benchmark_distances: Distances, find: Callable[[Distances, bool], int | None]
+) -> None:
+    find(benchmark_distances, False)
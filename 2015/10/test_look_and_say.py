@@ -1,4 +1,8 @@
+import re
+from collections import Counter
 from collections.abc import Iterable
+from functools import cache
+from itertools import islice
 
 from pytest import mark
 
@@ -37,6 +41,83 @@ def look_and_say_iterations(s: Iterable[str], num_iterations: int) -> int:
     return len("".join(iterable))
 
 
+RUN_REGEX = re.compile(r"(\d)\1*")
+Run = tuple[str, int]
+
+
+def look_and_say_length(s: str, num_iterations: int) -> int:
+    # Conway's splitting theorem only applies to strings which are at least two days old
+    for _ in range(min(num_iterations, 2)):
+        s = look_and_say(s)
+
+    element_counts = Counter(split_into_elements(s))
+
+    for _ in range(num_iterations - 2):
+        next_element_counts: Counter[str] = Counter()
+
+        for element, count in element_counts.items():
+            for decayed_element in _decay(element):
+                next_element_counts[decayed_element] += count
+
+        element_counts = next_element_counts
+
+    return sum(len(element) * count for element, count in element_counts.items())
+
+
+def split_into_elements(s: str) -> list[str]:
+    elements = []
+    element_begin = 0
+
+    for index in range(1, len(s)):
+        if s[index - 1] != s[index] and _can_split(s[index - 1], _get_leading_runs(s, index)):
+            elements.append(s[element_begin:index])
+            element_begin = index
+
+    elements.append(s[element_begin:])
+
+    return elements
+
+
+@cache
+def _decay(element: str) -> list[str]:
+    return split_into_elements(look_and_say(element))
+
+
+def _can_split(left_digit: str, right_runs: list[Run]) -> bool:
+    right_digit, right_count = right_runs[0]
+
+    if left_digit >= "4":
+        return right_digit <= "3"
+    elif left_digit == "2":
+        return _is_split_start(right_runs)
+    elif right_digit == "2" and right_count == 2:
+        return (
+            len(right_runs) == 1
+            or (len(right_runs) == 2 and right_runs[1][0] >= "4" and right_runs[1][1] == 1)
+            or _is_split_start(right_runs[1:])
+        )
+
+    return False
+
+
+def _is_split_start(runs: list[Run]) -> bool:
+    digit, count = runs[0]
+
+    if digit == "1":
+        return count == 3 or (count == 1 and len(runs) > 1 and runs[1][1] == 1)
+    elif digit == "3":
+        return count == 1 and len(runs) > 1 and runs[1][1] != 3
+    elif digit >= "4":
+        return count == 1
+
+    return False
+
+
+def _get_leading_runs(s: str, begin: int) -> list[Run]:
+    # The splitting rules never look further than three runs ahead
+    return [(match[1], len(match[0])) for match in islice(RUN_REGEX.finditer(s, begin), 3)]
+
+
 @mark.parametrize(
     ("s", "expected_output"), [("1", "11"), ("11", "21"), ("21", "1211"), ("1211", "111221"), ("111221", "312211")]
 )
@@ -49,3 +130,21 @@ def test_look_and_say(s: str, expected_output: str) -> None:
 )
 def test_look_and_say_iterations(s: str, num_iterations: int, expected_length: int) -> None:
     assert look_and_say_iterations(s, num_iterations) == expected_length
+
+
+@mark.parametrize(
+    ("s", "num_iterations", "expected_length"),
+    [("1", 0, 1), ("1", 1, 2), ("1", 5, 6), ("1113222113", 40, 252594), ("1113222113", 50, 3579328)],
+)
+def test_look_and_say_length(s: str, num_iterations: int, expected_length: int) -> None:
+    assert look_and_say_length(s, num_iterations) == expected_length
+
+
+@mark.parametrize("s", ["1", "3", "22", "123", "1211", "4441", "98765", "3113322113", "111312211"])
+def test_look_and_say_length_matches_iterations(s: str) -> None:
+    for num_iterations in range(30):
+        assert look_and_say_length(s, num_iterations) == look_and_say_iterations(s, num_iterations)
+
+
+def test_look_and_say_length_with_hundreds_of_iterations() -> None:
+    assert look_and_say_length("1113222113", 500) > 10**57
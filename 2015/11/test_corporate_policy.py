@@ -1,7 +1,9 @@
 from collections import defaultdict
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
+from functools import partial
+from random import Random
 
-from pytest import mark
+from pytest import fixture, mark
 
 
 def is_valid_password(password: str) -> bool:
@@ -70,6 +72,88 @@ def increment(codes: list[int]) -> None:
     raise RuntimeError("Overflow!")
 
 
+ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+FORBIDDEN_DIGITS = {ALPHABET.index(letter) for letter in FORBIDDEN_LETTERS}
+
+
+def next_valid_passwords(current_password: str, num_passwords: int) -> list[str]:
+    digits = [ALPHABET.index(char) for char in current_password]
+    # has_straight[index] and pair_counts[index] describe the prefix ending at index
+    has_straight = [False] * len(digits)
+    pair_counts = [0] * len(digits)
+
+    if not _skip_forbidden_prefix(digits):
+        _increment_digits(digits)
+
+    changed_index = 0
+    output = []
+
+    while True:
+        _update_prefix_states(digits, has_straight, pair_counts, changed_index)
+
+        if has_straight[-1] and pair_counts[-1] >= 2:
+            output.append("".join(ALPHABET[digit] for digit in digits))
+
+            if len(output) == num_passwords:
+                return output
+
+        changed_index = _increment_digits(digits)
+
+
+def _skip_forbidden_prefix(digits: list[int]) -> bool:
+    for index, digit in enumerate(digits):
+        if digit in FORBIDDEN_DIGITS:
+            # The letters after i, l and o are all allowed, and every candidate with this prefix is forbidden
+            digits[index] += 1
+            digits[index + 1 :] = [0] * (len(digits) - index - 1)
+            return True
+
+    return False
+
+
+def _increment_digits(digits: list[int]) -> int:
+    for index in range(len(digits) - 1, -1, -1):
+        new_digit = digits[index] + 1
+
+        if new_digit in FORBIDDEN_DIGITS:
+            new_digit += 1
+
+        if new_digit < len(ALPHABET):
+            digits[index] = new_digit
+            return index
+
+        digits[index] = 0
+
+    raise RuntimeError("Overflow!")
+
+
+def _update_prefix_states(digits: list[int], has_straight: list[bool], pair_counts: list[int], begin: int) -> None:
+    for index in range(begin, len(digits)):
+        has_straight[index] = (has_straight[index - 1] if index > 0 else False) or (
+            index >= 2 and digits[index - 2] + 2 == digits[index - 1] + 1 == digits[index]
+        )
+        pair_counts[index] = (pair_counts[index - 1] if index > 0 else 0) + (
+            index >= 1
+            and digits[index - 1] == digits[index]
+            # A pair overlapping the previous pair of the same letter does not count
+            and not (index >= 2 and digits[index - 2] == digits[index - 1])
+        )
+
+
+def _generate_passwords(num_passwords: int, seed: int) -> list[str]:
+    random = Random(seed)
+    allowed_letters = [letter for letter in ALPHABET if letter not in FORBIDDEN_LETTERS]
+    straights = [ALPHABET[index : index + 3] for index in range(len(ALPHABET) - 2)]
+    allowed_straights = [straight for straight in straights if FORBIDDEN_LETTERS.isdisjoint(straight)]
+    # Starting with a straight keeps the search within the last few letters, where the old solver stays tractable
+    return [
+        random.choice(allowed_straights) + "".join(random.choices(allowed_letters, k=5)) for _ in range(num_passwords)
+    ]
+
+
+BENCHMARK_NUM_PASSWORDS = 1
+
+
 @mark.parametrize(
     ("password", "is_valid"), [("hijklmmn", False), ("abbceffg", False), ("abbcegjk", False), ("abcdffaa", True)]
 )
@@ -83,3 +167,41 @@ def test_is_valid_password(password: str, is_valid: bool) -> None:
 )
 def test_find_next_valid_password(current_password: str, next_password: str) -> None:
     assert next_valid_password(current_password) == next_password
+
+
+@mark.parametrize(
+    ("current_password", "next_password"),
+    [("abcdefgh", "abcdffaa"), ("ghijklmn", "ghjaabcc"), ("hxbxwxba", "hxbxxyzz"), ("hxbxxyzz", "hxcaabcc")],
+)
+def test_find_next_valid_passwords(current_password: str, next_password: str) -> None:
+    assert next_valid_passwords(current_password, 1) == [next_password]
+
+
+@mark.parametrize(
+    ("current_password", "next_passwords"),
+    [
+        ("abcdefgh", ["abcdffaa", "abcdffbb", "abcdffcc"]),
+        ("abcdffzz", ["abcdggaa", "abcdggbb", "abcdggcc"]),
+        ("pqrstuvw", ["pqrsuuaa", "pqrsuubb", "pqrsuucc"]),
+        ("xyzaabaa", ["xyzaabba", "xyzaabbb", "xyzaabbc"]),
+        ("bcclfx", ["bcddaa", "bcddbb", "bcddcc"]),
+    ],
+)
+def test_find_several_next_valid_passwords(current_password: str, next_passwords: list[str]) -> None:
+    assert next_valid_passwords(current_password, 3) == next_passwords
+
+
+@fixture(scope="module")
+def benchmark_passwords(benchmark_scale: int) -> list[str]:
+    return _generate_passwords(BENCHMARK_NUM_PASSWORDS * benchmark_scale, seed=0)
+
+
+@mark.benchmark
+@mark.parametrize(
+    "find_next",
+    [next_valid_password, partial(next_valid_passwords, num_passwords=1)],
+    ids=["next_valid_password", "next_valid_passwords"],
+)
+def test_benchmark_next_valid_password(benchmark_passwords: list[str], find_next: Callable[[str], object]) -> None:
+    for password in benchmark_passwords:
+        find_next(password)
@@ -1,7 +1,12 @@
-from json import load
-from os.path import dirname, join
+import re
+from dataclasses import dataclass
+from io import StringIO
+from json import dumps, loads
+from typing import TextIO
 
-from pytest import mark
+from pytest import fixture, mark, raises
+
+from input_loader import load_parsed, puzzle_input_path
 
 
 def json_sum(json_input: object, ignore_red: bool) -> int:
@@ -20,7 +25,79 @@ def json_sum(json_input: object, ignore_red: bool) -> int:
     raise RuntimeError(f"Unexpected type {json_input=} {type(json_input)=}")
 
 
-PUZZLE_INPUT = load(open(join(dirname(__file__), "puzzle_input.json")))
+@dataclass
+class Frame:
+    is_object: bool
+    expecting_key: bool
+    subtotal: int = 0
+    contains_red: bool = False
+
+
+TOKEN_REGEX = re.compile(
+    r'\s*(?:(?P<string>"(?:[^"\\]|\\.)*")|(?P<number>-?\d+)|(?P<punctuation>[{}\[\]:,])|(?P<literal>true|false|null))'
+)
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def json_sum_streaming(json_file: TextIO, ignore_red: bool, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    # Only the open containers are kept, so memory is proportional to the nesting depth rather than the document
+    stack = [Frame(is_object=False, expecting_key=False)]
+    buffer = ""
+
+    while True:
+        chunk = json_file.read(chunk_size)
+        buffer += chunk
+        position = 0
+
+        while match := TOKEN_REGEX.match(buffer, position):
+            # A number at the end of the buffer may continue in the next chunk
+            if match.end() == len(buffer) and match["number"] is not None and chunk:
+                break
+
+            position = match.end()
+            _process_token(stack, match, ignore_red)
+
+        buffer = buffer[position:]
+
+        if not chunk:
+            break
+
+    if buffer.strip() or len(stack) != 1:
+        raise RuntimeError(f"Unexpected end of input {buffer=}")
+
+    return stack[0].subtotal
+
+
+def _process_token(stack: list[Frame], match: re.Match[str], ignore_red: bool) -> None:
+    frame = stack[-1]
+
+    if (string := match["string"]) is not None:
+        if frame.is_object and not frame.expecting_key and string == '"red"':
+            frame.contains_red = True
+    elif (number := match["number"]) is not None:
+        frame.subtotal += int(number)
+    elif (punctuation := match["punctuation"]) == "{":
+        stack.append(Frame(is_object=True, expecting_key=True))
+    elif punctuation == "[":
+        stack.append(Frame(is_object=False, expecting_key=False))
+    elif punctuation in {"}", "]"}:
+        if len(stack) == 1 or frame.is_object != (punctuation == "}"):
+            raise RuntimeError(f"Unexpected {punctuation=}")
+
+        stack.pop()
+        stack[-1].subtotal += 0 if ignore_red and frame.contains_red else frame.subtotal
+    elif punctuation == ":":
+        frame.expecting_key = False
+    elif punctuation == ",":
+        frame.expecting_key = frame.is_object
+
+
+PUZZLE_INPUT_PATH = puzzle_input_path(__file__, "puzzle_input.json")
+
+
+@fixture
+def puzzle_input() -> object:
+    return load_parsed(PUZZLE_INPUT_PATH, loads)
 
 
 @mark.parametrize(
@@ -34,7 +111,6 @@ PUZZLE_INPUT = load(open(join(dirname(__file__), "puzzle_input.json")))
         ([-1, {"a": 1}], 0),
         ([], 0),
         ({}, 0),
-        (PUZZLE_INPUT, 111754),
     ],
 )
 def test_json_sum(json_input: object, expected_sum: int) -> None:
@@ -48,8 +124,54 @@ def test_json_sum(json_input: object, expected_sum: int) -> None:
         ([1, {"c": "red", "b": 2}, 3], 4),
         ({"d": "red", "e": [1, 2, 3, 4], "f": 5}, 0),
         ([1, "red", 5], 6),
-        (PUZZLE_INPUT, 65402),
     ],
 )
 def test_json_sum_ignoring_red(json_input: object, expected_sum: int) -> None:
     assert json_sum(json_input, ignore_red=True) == expected_sum
+
+
+@mark.parametrize(("ignore_red", "expected_sum"), [(False, 111754), (True, 65402)])
+def test_json_sum_puzzle_input(puzzle_input: object, ignore_red: bool, expected_sum: int) -> None:
+    assert json_sum(puzzle_input, ignore_red) == expected_sum
+
+
+@mark.parametrize("chunk_size", [1, 5, DEFAULT_CHUNK_SIZE])
+@mark.parametrize("ignore_red", [False, True])
+@mark.parametrize(
+    "json_input",
+    [
+        [1, 2, 3],
+        {"a": 2, "b": 4},
+        [[[3]]],
+        {"a": {"b": 4}, "c": -1},
+        {"a": [-1, 1]},
+        [-1, {"a": 1}],
+        [],
+        {},
+        [1, {"c": "red", "b": 2}, 3],
+        {"d": "red", "e": [1, 2, 3, 4], "f": 5},
+        [1, "red", 5],
+        {"red": 1, "a": ["red", {"b": 're"d', "c": 12345}]},
+    ],
+)
+def test_json_sum_streaming(json_input: object, ignore_red: bool, chunk_size: int) -> None:
+    json_file = StringIO(dumps(json_input, indent=1))
+    assert json_sum_streaming(json_file, ignore_red, chunk_size) == json_sum(json_input, ignore_red)
+
+
+@mark.parametrize(("ignore_red", "expected_sum"), [(False, 111754), (True, 65402)])
+def test_json_sum_streaming_puzzle_input(ignore_red: bool, expected_sum: int) -> None:
+    with open(PUZZLE_INPUT_PATH) as json_file:
+        assert json_sum_streaming(json_file, ignore_red, chunk_size=7) == expected_sum
+
+
+def test_json_sum_streaming_handles_deep_nesting() -> None:
+    depth = 100_000
+    json_file = StringIO("[" * depth + '{"a": 7}' + "]" * depth)
+    assert json_sum_streaming(json_file, ignore_red=False) == 7
+
+
+@mark.parametrize("raw_input", ["[1, 2", "[1}", "]", "[1.5]"])
+def test_json_sum_streaming_rejects_invalid_input(raw_input: str) -> None:
+    with raises(RuntimeError):
+        json_sum_streaming(StringIO(raw_input), ignore_red=False)
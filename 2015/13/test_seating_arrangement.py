@@ -1,6 +1,9 @@
+from array import array
 from collections import defaultdict
 from collections.abc import MutableMapping
-from itertools import permutations
+from itertools import accumulate, compress, permutations
+from operator import add, not_
+from random import Random
 
 from pytest import mark
 
@@ -20,6 +23,53 @@ def get_happiness_change(ordered_names: tuple[str, ...], happiness: Happiness) -
     )
 
 
+def seating_arrangements_dp(happiness: Happiness) -> tuple[int, int]:
+    names = sorted(happiness.keys())
+
+    if len(names) < 2:
+        return 0, 0
+
+    pair_happiness = [
+        [0 if name == other else happiness[name][other] + happiness[other][name] for other in names] for name in names
+    ]
+    first_guest_pairs = pair_happiness[0][1:]
+    other_guest_pairs = [pairs[1:] for pairs in pair_happiness[1:]]
+    num_others = len(names) - 1
+    full_mask = (1 << num_others) - 1
+    guest_bits = [1 << guest for guest in range(num_others)]
+    lower_bits = [bit - 1 for bit in guest_bits]
+    # The first guest is fixed at the head of the table to remove rotational symmetry. best_paths holds one row per
+    # mask of the other guests, with the best happiness of a path from the first guest through the guests in mask
+    # ending at each of them in order, so the row of mask starts at row_starts[mask] and has one entry per set bit.
+    row_starts = array("q", accumulate((mask.bit_count() for mask in range(full_mask + 1)), initial=0))
+    best_paths = array("q", [0]) * row_starts[-1]
+
+    for bit, pair in zip(guest_bits, first_guest_pairs, strict=True):
+        best_paths[row_starts[bit]] = pair
+
+    for mask in range(1, full_mask):
+        path_ends = best_paths[row_starts[mask] : row_starts[mask + 1]]
+        in_mask = [mask & bit for bit in guest_bits]
+
+        # Each path is extended by every guest not yet seated, pairing the path ends with that guest's neighbours
+        for guest in compress(range(num_others), map(not_, in_mask)):
+            best_paths[row_starts[mask | guest_bits[guest]] + (mask & lower_bits[guest]).bit_count()] = max(
+                map(add, path_ends, compress(other_guest_pairs[guest], in_mask), strict=True)
+            )
+
+    best_circle = max(map(add, best_paths[row_starts[full_mask] :], first_guest_pairs, strict=True))
+    # Sitting yourself down breaks the circle into a path, which the first guest splits into two paths from them
+    best_from_first_guest = array(
+        "q", [0] + [max(best_paths[row_starts[mask] : row_starts[mask + 1]]) for mask in range(1, full_mask + 1)]
+    )
+    # A split and its reflection make the same path, so only the splits which leave the last guest out of mask are tried
+    best_path = max(
+        best_from_first_guest[mask] + best_from_first_guest[full_mask ^ mask] for mask in range(1 << (num_others - 1))
+    )
+
+    return best_circle, best_path
+
+
 def parse_input(raw_input: str) -> Happiness:
     output: Happiness = defaultdict(lambda: defaultdict(int))
 
@@ -122,3 +172,27 @@ def test_seating_arrangement_with_yourself(raw_input: str, expected_output: int)
         happiness[name]["Yourself"] = 0
 
     assert seating_arrangement(happiness) == expected_output
+
+
+@mark.parametrize(("raw_input", "expected_output"), [(EXAMPLE_INPUT, (330, 286)), (PUZZLE_INPUT, (618, 601))])
+def test_seating_arrangements_dp(raw_input: str, expected_output: tuple[int, int]) -> None:
+    happiness = parse_input(raw_input)
+    assert seating_arrangements_dp(happiness) == expected_output
+
+
+@mark.parametrize("num_guests", range(1, 7))
+def test_seating_arrangements_dp_matches_permutations(num_guests: int) -> None:
+    random = Random(num_guests)
+    names = [f"Guest{index}" for index in range(num_guests)]
+    happiness: Happiness = defaultdict(lambda: defaultdict(int))
+    happiness_with_yourself: Happiness = defaultdict(lambda: defaultdict(int))
+
+    for name in names:
+        happiness_with_yourself[name]["Yourself"] = happiness_with_yourself["Yourself"][name] = 0
+
+        for other in names:
+            if name != other:
+                happiness[name][other] = happiness_with_yourself[name][other] = random.randint(-100, 100)
+
+    expected_output = (seating_arrangement(happiness), seating_arrangement(happiness_with_yourself))
+    assert seating_arrangements_dp(happiness) == expected_output
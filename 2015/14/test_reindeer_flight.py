@@ -1,7 +1,11 @@
-from collections import defaultdict
+from bisect import bisect_right
+from collections import Counter, defaultdict
 from collections.abc import MutableMapping
 from dataclasses import dataclass
 from enum import Enum
+from fractions import Fraction
+from math import floor, gcd, inf, lcm, prod
+from random import Random
 from re import Pattern, compile
 
 from pytest import mark
@@ -64,6 +68,222 @@ def get_point_leader(raw_input: str, num_seconds: int) -> int:
     return max(points.values())
 
 
+def get_distance_after(reindeer: Reindeer, num_seconds: int) -> int:
+    num_periods, remainder = divmod(num_seconds, reindeer.flight_time + reindeer.rest_time)
+    return (num_periods * reindeer.flight_time + min(remainder, reindeer.flight_time)) * reindeer.flight_speed
+
+
+def get_distance_of_fastest_reindeer_closed_form(raw_input: str, num_seconds: int) -> int:
+    return max(get_distance_after(reindeer, num_seconds) for reindeer in parse_input(raw_input))
+
+
+def get_point_leader_event_driven(raw_input: str, num_seconds: int) -> int:
+    herd = parse_input(raw_input)
+    points = [0] * len(herd)
+    leader, last_lead_changes = _get_last_lead_changes(herd)
+    # Reindeer are dropped from the end once they can never lead again
+    contenders = sorted(range(len(herd)), key=last_lead_changes.__getitem__, reverse=True)
+    elapsed = 0
+
+    while elapsed < num_seconds:
+        while contenders and last_lead_changes[contenders[-1]] <= elapsed + 1:
+            contenders.pop()
+
+        if not contenders:
+            points[leader] += num_seconds - elapsed
+            break
+
+        contenders_with_leader = [leader, *contenders]
+
+        if last_lead_changes[contenders[-1]] == inf:
+            # Only reindeer tied with the leader's average remain, so the gaps between them repeat every common period
+            cycle = lcm(*(herd[index].flight_time + herd[index].rest_time for index in contenders_with_leader))
+            num_cycles, remainder = divmod(num_seconds - elapsed, cycle)
+
+            if num_cycles:
+                cycle_points = _score_tied_cycle(herd, contenders_with_leader)
+
+                for index, cycle_point in zip(contenders_with_leader, cycle_points, strict=True):
+                    points[index] += num_cycles * cycle_point
+
+                # A reindeer that never leads within a whole cycle never leads within part of one either
+                contenders_with_leader = [
+                    index
+                    for index, cycle_point in zip(contenders_with_leader, cycle_points, strict=True)
+                    if cycle_point
+                ]
+
+            remainder_points = _score_tied_race(herd, contenders_with_leader, elapsed, elapsed + remainder)
+
+            for index, remainder_point in zip(contenders_with_leader, remainder_points, strict=True):
+                points[index] += remainder_point
+
+            break
+
+        interval_end = min(
+            num_seconds, *(_get_next_phase_change(herd[index], elapsed) for index in contenders_with_leader)
+        )
+
+        interval_points = _score_interval(
+            [get_distance_after(herd[index], elapsed) for index in contenders_with_leader],
+            [_get_speed_after(herd[index], elapsed) for index in contenders_with_leader],
+            interval_end - elapsed,
+        )
+
+        for index, interval_point in zip(contenders_with_leader, interval_points, strict=True):
+            points[index] += interval_point
+
+        elapsed = interval_end
+
+    return max(points)
+
+
+def _get_last_lead_changes(herd: list[Reindeer]) -> tuple[int, list[float]]:
+    average_speeds = [
+        Fraction(reindeer.flight_speed * reindeer.flight_time, reindeer.flight_time + reindeer.rest_time)
+        for reindeer in herd
+    ]
+    leader = max(range(len(herd)), key=average_speeds.__getitem__)
+    last_lead_changes: list[float] = [inf] * len(herd)
+
+    for index, reindeer in enumerate(herd):
+        if index != leader and average_speeds[index] < average_speeds[leader]:
+            # A reindeer is never further ahead of its average pace than one flight, so once the leader's average
+            # advantage exceeds that flight it stays strictly behind
+            one_flight = reindeer.flight_speed * reindeer.flight_time
+            last_lead_changes[index] = floor(one_flight / (average_speeds[leader] - average_speeds[index])) + 1
+
+    last_lead_changes[leader] = -inf
+
+    return leader, last_lead_changes
+
+
+def _get_tied_leads(herd: list[Reindeer], indices: list[int]) -> tuple[list[int], list[list[int]]]:
+    periods = [herd[index].flight_time + herd[index].rest_time for index in indices]
+    average_speed = Fraction(herd[indices[0]].flight_speed * herd[indices[0]].flight_time, periods[0])
+    # With equal averages, each reindeer's lead over the average pace only depends on the time modulo its own period,
+    # and scaling it by the average's denominator keeps it whole
+    leads = [
+        [
+            get_distance_after(herd[index], second) * average_speed.denominator - average_speed.numerator * second
+            for second in range(period)
+        ]
+        for index, period in zip(indices, periods, strict=True)
+    ]
+
+    return periods, leads
+
+
+def _score_tied_race(herd: list[Reindeer], indices: list[int], begin: int, end: int) -> list[int]:
+    periods, leads = _get_tied_leads(herd, indices)
+    points = [0] * len(indices)
+
+    for second in range(begin + 1, end + 1):
+        second_leads = [lead[second % period] for lead, period in zip(leads, periods, strict=True)]
+        best_lead = max(second_leads)
+
+        for position, second_lead in enumerate(second_leads):
+            if second_lead == best_lead:
+                points[position] += 1
+
+    return points
+
+
+def _score_tied_cycle(herd: list[Reindeer], indices: list[int]) -> list[int]:
+    periods, leads = _get_tied_leads(herd, indices)
+    # Reindeer whose periods share a factor are grouped together, so the common periods of different groups share no
+    # factor and every combination of times within each group's common period happens once per cycle
+    groups: list[tuple[int, list[int]]] = []
+
+    for position, period in enumerate(periods):
+        merged = [group for group in groups if gcd(group[0], period) > 1]
+        groups = [group for group in groups if gcd(group[0], period) == 1]
+        groups.append(
+            (
+                lcm(period, *(group[0] for group in merged)),
+                [position, *(member for group in merged for member in group[1])],
+            )
+        )
+
+    group_best_leads: list[list[int]] = []
+    group_leaders: list[Counter[tuple[int, int]]] = []
+
+    for group_period, members in groups:
+        best_leads = []
+        leaders: Counter[tuple[int, int]] = Counter()
+
+        for second in range(group_period):
+            member_leads = [leads[member][second % periods[member]] for member in members]
+            best_lead = max(member_leads)
+            best_leads.append(best_lead)
+            leaders.update(
+                (member, best_lead)
+                for member, member_lead in zip(members, member_leads, strict=True)
+                if member_lead == best_lead
+            )
+
+        group_best_leads.append(sorted(best_leads))
+        group_leaders.append(leaders)
+
+    points = [0] * len(indices)
+
+    # A reindeer leading its group scores for every combination of times in which no other group is further ahead
+    for group_index, leaders in enumerate(group_leaders):
+        for (member, lead), count in leaders.items():
+            points[member] += count * prod(
+                bisect_right(best_leads, lead)
+                for other_index, best_leads in enumerate(group_best_leads)
+                if other_index != group_index
+            )
+
+    return points
+
+
+def _get_next_phase_change(reindeer: Reindeer, elapsed: int) -> int:
+    period = reindeer.flight_time + reindeer.rest_time
+    period_begin = elapsed - elapsed % period
+
+    if elapsed - period_begin < reindeer.flight_time:
+        return period_begin + reindeer.flight_time
+
+    return period_begin + period
+
+
+def _get_speed_after(reindeer: Reindeer, elapsed: int) -> int:
+    period = reindeer.flight_time + reindeer.rest_time
+    return reindeer.flight_speed if elapsed % period < reindeer.flight_time else 0
+
+
+def _score_interval(start_distances: list[int], speeds: list[int], num_seconds: int) -> list[int]:
+    points = [0] * len(start_distances)
+    second = 1
+
+    while second <= num_seconds:
+        distances = [distance + speed * second for distance, speed in zip(start_distances, speeds, strict=True)]
+        max_distance = max(distances)
+        leaders = [index for index, distance in enumerate(distances) if distance == max_distance]
+        leader_speed = max(speeds[index] for index in leaders)
+        next_change = second + 1
+
+        if all(speeds[index] == leader_speed for index in leaders):
+            # The leaders stay tied until a faster reindeer catches up with them
+            next_change = min(
+                [num_seconds + 1]
+                + [
+                    second + -(-(max_distance - distance) // (speed - leader_speed))
+                    for distance, speed in zip(distances, speeds, strict=True)
+                    if speed > leader_speed
+                ]
+            )
+
+        for index in leaders:
+            points[index] += next_change - second
+
+        second = next_change
+
+    return points
+
+
 def parse_input(raw_input: str) -> list[Reindeer]:
     pattern = "([A-z]+) can fly ([0-9]+) km\\/s for ([0-9]+) seconds, but then must rest for ([1-9]+) seconds."
     regex = compile(pattern)
@@ -135,3 +355,92 @@ def test_get_distance_of_fastest_reindeer(raw_input: str, num_seconds: int, expe
 )
 def test_get_point_leader(raw_input: str, num_seconds: int, expected_points: int) -> None:
     assert get_point_leader(raw_input, num_seconds) == expected_points
+
+
+@mark.parametrize(
+    ("seconds", "expected_distance"),
+    [(0, 0), (1, 14), (10, 140), (11, 140), (137, 140), (138, 154), (147, 280), (148, 280)],
+)
+def test_get_distance_after(seconds: int, expected_distance: int) -> None:
+    assert get_distance_after(Reindeer("Comet", 14, 10, 127), seconds) == expected_distance
+
+
+@mark.parametrize(
+    ("raw_input", "num_seconds", "expected_distance"),
+    [
+        (EXAMPLE_INPUT, 1, 16),
+        (EXAMPLE_INPUT, 10, 160),
+        (EXAMPLE_INPUT, 11, 176),
+        (EXAMPLE_INPUT, 1000, 1120),
+        (PUZZLE_INPUT, 2503, 2660),
+    ],
+)
+def test_get_distance_of_fastest_reindeer_closed_form(raw_input: str, num_seconds: int, expected_distance: int) -> None:
+    assert get_distance_of_fastest_reindeer_closed_form(raw_input, num_seconds) == expected_distance
+
+
+@mark.parametrize(
+    ("raw_input", "num_seconds", "expected_points"),
+    [
+        (EXAMPLE_INPUT, 1, 1),
+        (EXAMPLE_INPUT, 140, 139),
+        (EXAMPLE_INPUT, 1000, 689),
+        (PUZZLE_INPUT, 2503, 1256),
+    ],
+)
+def test_get_point_leader_event_driven(raw_input: str, num_seconds: int, expected_points: int) -> None:
+    assert get_point_leader_event_driven(raw_input, num_seconds) == expected_points
+
+
+@mark.parametrize("seed", range(10))
+def test_get_point_leader_event_driven_matches_simulation(seed: int) -> None:
+    random = Random(seed)
+    raw_input = "\n".join(
+        f"{chr(ord('A') + index)} can fly {random.randint(1, 5)} km/s for {random.randint(1, 6)} seconds, "
+        f"but then must rest for {random.randint(1, 9)} seconds."
+        for index in range(random.randint(1, 6))
+    )
+
+    for num_seconds in [1, 7, 100, 500]:
+        assert get_point_leader_event_driven(raw_input, num_seconds) == get_point_leader(raw_input, num_seconds)
+
+
+TIED_INPUT = """A can fly 12 km/s for 3 seconds, but then must rest for 3 seconds.
+B can fly 9 km/s for 4 seconds, but then must rest for 2 seconds.
+C can fly 5 km/s for 5 seconds, but then must rest for 5 seconds."""
+
+
+@mark.parametrize("num_seconds", [1, 5, 6, 7, 100, 1001])
+def test_get_point_leader_event_driven_with_tied_averages(num_seconds: int) -> None:
+    assert get_point_leader_event_driven(TIED_INPUT, num_seconds) == get_point_leader(TIED_INPUT, num_seconds)
+
+
+def test_get_point_leader_event_driven_with_tied_averages_over_long_race() -> None:
+    # A and B both average 6 km/s and repeat their gap every 6 seconds, while C falls behind for good
+    num_cycles = 10**7
+    cycle_points = get_point_leader(TIED_INPUT, 60) - get_point_leader(TIED_INPUT, 54)
+
+    assert get_point_leader_event_driven(TIED_INPUT, 60 + 6 * num_cycles) == (
+        get_point_leader(TIED_INPUT, 60) + num_cycles * cycle_points
+    )
+
+
+COPRIME_TIED_INPUT = """A can fly 8 km/s for 3 seconds, but then must rest for 1 seconds.
+B can fly 10 km/s for 3 seconds, but then must rest for 2 seconds.
+C can fly 14 km/s for 3 seconds, but then must rest for 4 seconds.
+D can fly 11 km/s for 6 seconds, but then must rest for 5 seconds.
+E can fly 13 km/s for 6 seconds, but then must rest for 7 seconds.
+F can fly 17 km/s for 6 seconds, but then must rest for 11 seconds."""
+
+
+@mark.parametrize("num_seconds", [1, 4, 140, 1001])
+def test_get_point_leader_event_driven_with_coprime_tied_periods(num_seconds: int) -> None:
+    assert get_point_leader_event_driven(COPRIME_TIED_INPUT, num_seconds) == get_point_leader(
+        COPRIME_TIED_INPUT, num_seconds
+    )
+
+
+def test_get_point_leader_event_driven_with_coprime_tied_periods_over_long_race() -> None:
+    # All six average 6 km/s and only repeat their gaps every 340340 seconds, so the answer was checked by simulating
+    # one common period and the remainder second by second
+    assert get_point_leader_event_driven(COPRIME_TIED_INPUT, 10**9) == 627551863
@@ -1,5 +1,9 @@
 from collections.abc import Iterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from itertools import permutations
+from math import ceil, floor, gcd, prod
+from operator import mul
+from random import Random
 from re import compile
 
 from pytest import mark
@@ -59,6 +63,497 @@ def get_best_recipe_score(raw_input: str, target_calories=None) -> int | None:
     return max_score
 
 
+Properties = tuple[int, ...]
+# A calorie weight, each ingredient's value less the calorie weight times its calories, and the maximum of those from
+# each ingredient onwards
+CalorieCut = tuple[float, list[float], list[float]]
+
+
+@dataclass
+class RecipeSearch:
+    properties: list[Properties]
+    calories: list[int]
+    target_calories: int | None
+    # For each property, the cuts which bound it linearly in the amount given to an ingredient
+    property_cuts: list[list[CalorieCut]]
+    calorie_range_from: list[tuple[int, int]]
+    guide: Quantities
+    best_score: int | None = None
+    # Property totals of a good recipe weight the AM-GM bound, which makes it tight near that recipe
+    weights: Properties | None = None
+    weighted_cuts: list[CalorieCut] = field(default_factory=list)
+
+
+def get_best_recipe_score_pruned(raw_input: str, target_calories=None, total_amount: int = 100) -> int | None:
+    ingredients = parse_input(raw_input)
+    properties: list[Properties] = [
+        (ingredient.capacity, ingredient.durability, ingredient.flavour, ingredient.texture)
+        for ingredient in ingredients
+    ]
+    calories = [ingredient.calories for ingredient in ingredients]
+    search = RecipeSearch(
+        properties=properties,
+        calories=calories,
+        target_calories=target_calories,
+        property_cuts=[
+            _get_calorie_cuts(list(values), calories, target_calories is not None)
+            for values in zip(*properties, strict=True)
+        ],
+        calorie_range_from=[(min(calories[index:]), max(calories[index:])) for index in range(len(calories))],
+        guide=_climb_recipe(properties, calories, target_calories, total_amount),
+    )
+
+    guide_totals = _get_totals(properties, search.guide)
+
+    if min(guide_totals) > 0:
+        _set_weights(search, guide_totals)
+
+    if target_calories is None or sum(map(mul, search.guide, calories, strict=True)) == target_calories:
+        # Starting from a good recipe lets the bound prune from the first branch
+        _update_best_score(search, _score_totals(guide_totals), guide_totals)
+
+    _search_recipes(search, 0, total_amount, (0, 0, 0, 0), 0)
+
+    return search.best_score
+
+
+def _search_recipes(search: RecipeSearch, index: int, amount_left: int, totals: Properties, calories: int) -> None:
+    min_calories, max_calories = search.calorie_range_from[index]
+
+    if search.target_calories is not None and not (
+        calories + amount_left * min_calories <= search.target_calories <= calories + amount_left * max_calories
+    ):
+        return
+
+    if index == len(search.properties) - 1:
+        if search.target_calories is None or calories + amount_left * search.calories[index] == search.target_calories:
+            final_totals = tuple(
+                total + amount_left * value for total, value in zip(totals, search.properties[index], strict=True)
+            )
+            _update_best_score(search, _score_totals(final_totals), final_totals)
+
+        return
+
+    if index == len(search.properties) - 2:
+        _search_last_pair(search, amount_left, totals, calories)
+        return
+
+    if (
+        index == len(search.properties) - 3
+        and search.target_calories is not None
+        and search.calories[-2] != search.calories[-1]
+    ):
+        _search_last_three(search, amount_left, totals, calories)
+        return
+
+    # The last ingredients are searched in closed form above, which costs less than bounding them
+    if (
+        search.best_score is not None
+        and _get_upper_bound(search, index, amount_left, totals, calories) <= search.best_score
+    ):
+        return
+
+    begin, end = _get_amount_range(search, index, amount_left, totals, calories)
+
+    for amount in _get_amounts_around(min(max(search.guide[index], begin), end), begin, end):
+        _search_recipes(
+            search,
+            index + 1,
+            amount_left - amount,
+            tuple(total + amount * value for total, value in zip(totals, search.properties[index], strict=True)),
+            calories + amount * search.calories[index],
+        )
+
+
+def _get_amount_range(
+    search: RecipeSearch, index: int, amount_left: int, totals: Properties, calories: int
+) -> tuple[int, int]:
+    if search.best_score is None:
+        # Every child may still hold the first valid recipe
+        return 0, amount_left
+
+    # Each property of a child is bounded linearly in the amount given to this ingredient, by spending the rest on
+    # whichever later ingredient maximises it, and only recipes with every property positive score above 0
+    extra_calories = 0 if search.target_calories is None else calories - search.target_calories
+    lines = [
+        line
+        for total, cuts in zip(totals, search.property_cuts, strict=True)
+        for line in _get_cut_lines(cuts, index, amount_left, total - 1, extra_calories)
+    ]
+
+    if search.best_score and search.weights is not None:
+        # The weighted AM-GM bound is linear in the amount too, and has to beat the best score
+        threshold = len(totals) * (search.best_score / prod(search.weights)) ** (1 / len(totals)) * (1 - 1e-9)
+        weighted_sum = sum(total / weight for total, weight in zip(totals, search.weights, strict=True))
+        lines += _get_cut_lines(search.weighted_cuts, index, amount_left, weighted_sum - threshold, extra_calories)
+
+    begin, end = 0, amount_left
+
+    for offset, slope in lines:
+        if slope > 0:
+            begin = max(begin, floor(-offset / slope))
+        elif slope < 0:
+            end = min(end, ceil(offset / -slope))
+        elif offset < 0:
+            return 0, -1
+
+    return begin, end
+
+
+def _get_cut_lines(
+    cuts: list[CalorieCut], index: int, amount_left: int, offset: float, extra_calories: int
+) -> Iterable[tuple[float, float]]:
+    # Valid recipes all have the target calories, so any multiple of the calories beyond it can be taken away
+    for calorie_weight, values, max_values_from in cuts:
+        yield (
+            offset - calorie_weight * extra_calories + amount_left * max_values_from[index + 1],
+            values[index] - max_values_from[index + 1],
+        )
+
+
+def _search_last_pair(search: RecipeSearch, amount_left: int, totals: Properties, calories: int) -> None:
+    first, second = search.properties[-2:]
+    # Giving amount teaspoons to the first ingredient and the rest to the second makes each property linear in amount
+    lines = [
+        (total + amount_left * second_value, first_value - second_value)
+        for total, first_value, second_value in zip(totals, first, second, strict=True)
+    ]
+    begin, end = 0, amount_left
+
+    if search.target_calories is not None:
+        calorie_difference = search.calories[-2] - search.calories[-1]
+        missing_calories = search.target_calories - calories - amount_left * search.calories[-1]
+
+        if calorie_difference == 0:
+            if missing_calories != 0:
+                return
+        else:
+            # The calorie target fixes the split
+            amount, remainder = divmod(missing_calories, calorie_difference)
+
+            if remainder != 0 or not 0 <= amount <= amount_left:
+                return
+
+            begin = end = amount
+
+    _search_line(search, lines, begin, end)
+
+
+def _search_last_three(search: RecipeSearch, amount_left: int, totals: Properties, calories: int) -> None:
+    assert search.target_calories is not None
+    first, second, third = search.properties[-3:]
+    first_calories, second_calories, third_calories = search.calories[-3:]
+    # Giving first_amount teaspoons to the first ingredient, second_amount to the second and the rest to the third meets
+    # the target when first_amount * first_difference + second_amount * second_difference == missing_calories
+    first_difference = first_calories - third_calories
+    second_difference = second_calories - third_calories
+    missing_calories = search.target_calories - calories - amount_left * third_calories
+    divisor = gcd(first_difference, second_difference)
+
+    if missing_calories % divisor != 0:
+        return
+
+    # The amounts whose second_amount is a whole number repeat every step teaspoons from first_amount, and along them
+    # both amounts are linear in the number of steps taken
+    step = abs(second_difference) // divisor
+    first_amount = missing_calories // divisor * pow(first_difference // divisor, -1, step) % step
+    second_amount, remainder = divmod(missing_calories - first_amount * first_difference, second_difference)
+    assert remainder == 0
+    second_slope = -first_difference * step // second_difference
+    begin, end = _get_nonnegative_range(
+        [(second_amount, second_slope), (amount_left - first_amount - second_amount, -step - second_slope)],
+        0,
+        (amount_left - first_amount) // step,
+    )
+    lines = [
+        (
+            total
+            + first_amount * first_value
+            + second_amount * second_value
+            + (amount_left - first_amount - second_amount) * third_value,
+            step * first_value + second_slope * second_value + (-step - second_slope) * third_value,
+        )
+        for total, first_value, second_value, third_value in zip(totals, first, second, third, strict=True)
+    ]
+    _search_line(search, lines, begin, end)
+
+
+def _search_line(search: RecipeSearch, lines: list[tuple[int, int]], begin: int, end: int) -> None:
+    # Every point from begin to end is a valid recipe, whose property totals are linear in the point
+    if begin > end:
+        return
+
+    any_point = begin
+    # Only the points which make every property positive can score above 0
+    begin, end = _get_nonnegative_range([(offset - 1, slope) for offset, slope in lines], begin, end)
+
+    if begin > end:
+        _update_best_score(search, 0, _get_totals_on_lines(lines, any_point))
+        return
+
+    # A product of positive linear functions is log-concave, so the score rises to its maximum and then falls
+    while begin < end:
+        middle = (begin + end) // 2
+
+        if _score_totals(_get_totals_on_lines(lines, middle)) < _score_totals(_get_totals_on_lines(lines, middle + 1)):
+            begin = middle + 1
+        else:
+            end = middle
+
+    best_totals = _get_totals_on_lines(lines, begin)
+    _update_best_score(search, _score_totals(best_totals), best_totals)
+
+
+def _get_nonnegative_range(lines: list[tuple[int, int]], begin: int, end: int) -> tuple[int, int]:
+    for offset, slope in lines:
+        if slope > 0:
+            begin = max(begin, -(offset // slope))
+        elif slope < 0:
+            end = min(end, offset // -slope)
+        elif offset < 0:
+            return begin, begin - 1
+
+    return begin, end
+
+
+def _get_totals_on_lines(lines: list[tuple[int, int]], point: int) -> Properties:
+    return tuple(offset + point * slope for offset, slope in lines)
+
+
+MAX_BOUND_STEPS = 20
+
+
+def _get_upper_bound(search: RecipeSearch, index: int, amount_left: int, totals: Properties, calories: int) -> float:
+    # The property totals reachable from here are spanned by spending every remaining teaspoon on one feasible mix
+    vertices = [
+        tuple(total + amount_left * value for total, value in zip(totals, mix, strict=True))
+        for mix in _get_feasible_mixes(search, index, amount_left, calories)
+    ]
+
+    if not vertices:
+        return 0
+
+    property_bounds = tuple(map(max, zip(*vertices, strict=True)))
+
+    if min(property_bounds) <= 0:
+        return 0
+
+    upper_bound = min(
+        _get_weighted_bound(vertices, weights) for weights in (property_bounds, search.weights) if weights is not None
+    )
+
+    if not search.best_score:
+        # Tightening a positive bound cannot prune anything until some recipe scores above 0
+        return upper_bound
+
+    point = tuple(sum(column) / len(vertices) for column in zip(*vertices, strict=True))
+
+    # Frank-Wolfe steps towards the best continuous recipe, whose property totals are the tightest weights
+    for _ in range(MAX_BOUND_STEPS):
+        if min(point) <= 0 or upper_bound * (1 + 1e-9) <= search.best_score:
+            break
+
+        gains = [sum(value / weight for value, weight in zip(vertex, point, strict=True)) for vertex in vertices]
+        best_gain = max(gains)
+        upper_bound = min(upper_bound, prod(point) * (best_gain / len(point)) ** len(point))
+
+        if best_gain <= len(point):
+            # Nothing beats the point, so it is the best continuous recipe
+            break
+
+        direction = [value - weight for value, weight in zip(vertices[gains.index(best_gain)], point, strict=True)]
+        relative_direction = [change / weight for change, weight in zip(direction, point, strict=True)]
+        # A Newton step on the log of the product along the direction, kept short of any property reaching 0
+        step = sum(relative_direction) / sum(change * change for change in relative_direction)
+        step = min(step, 1, *(-0.5 / change for change in relative_direction if change < 0))
+        point = tuple(weight + step * change for weight, change in zip(point, direction, strict=True))
+
+    # The margin keeps float rounding from pruning a recipe which ties the best score
+    return upper_bound * (1 + 1e-9)
+
+
+def _get_weighted_bound(vertices: list[tuple[float, ...]], weights: Properties) -> float:
+    # By AM-GM the product of positive properties is at most the product of any positive weights times the mean
+    # weighted property to the fourth power, and the weighted sum is linear so it is largest at a vertex
+    best_weighted_sum = max(
+        sum(value / weight for value, weight in zip(vertex, weights, strict=True)) for vertex in vertices
+    )
+    return prod(weights) * max(best_weighted_sum / len(weights), 0) ** len(weights)
+
+
+def _get_feasible_mixes(
+    search: RecipeSearch, index: int, amount_left: int, calories: int
+) -> list[tuple[float, ...]] | list[Properties]:
+    if search.target_calories is None or amount_left == 0:
+        return search.properties[index:]
+
+    # Every mix of the remaining ingredients which meets the calorie target on average is a blend of the mixes of at
+    # most two ingredients which meet it exactly, so bounding linear functions over these mixes is enough
+    calories_per_amount = (search.target_calories - calories) / amount_left
+    mixes: list[tuple[float, ...]] = []
+
+    for low in range(index, len(search.properties)):
+        low_calories = search.calories[low]
+
+        if low_calories == calories_per_amount:
+            mixes.append(search.properties[low])
+        elif low_calories < calories_per_amount:
+            for high in range(index, len(search.properties)):
+                high_calories = search.calories[high]
+
+                if high_calories > calories_per_amount:
+                    share = (calories_per_amount - low_calories) / (high_calories - low_calories)
+                    mixes.append(
+                        tuple(
+                            low_value + share * (high_value - low_value)
+                            for low_value, high_value in zip(
+                                search.properties[low], search.properties[high], strict=True
+                            )
+                        )
+                    )
+
+    return mixes
+
+
+def _update_best_score(search: RecipeSearch, score: int, totals: Properties) -> None:
+    if search.best_score is not None and score <= search.best_score:
+        return
+
+    search.best_score = score
+
+    if score > 0:
+        _set_weights(search, totals)
+
+
+def _set_weights(search: RecipeSearch, weights: Properties) -> None:
+    search.weights = weights
+    weighted_values = [
+        sum(value / weight for value, weight in zip(properties, weights, strict=True))
+        for properties in search.properties
+    ]
+    search.weighted_cuts = _get_calorie_cuts(weighted_values, search.calories, search.target_calories is not None)
+
+
+def _get_calorie_cuts(values: list[float] | list[int], calories: list[int], has_target: bool) -> list[CalorieCut]:
+    calorie_weights = {0.0}
+
+    if has_target:
+        # Per teaspoon, the value of a recipe meeting the target from each ingredient onwards is bounded by the upper
+        # envelope of one line per ingredient in the calorie weight, which is tightest at one of its corners
+        lines = list(zip(values, calories, strict=True))
+
+        for index in range(len(lines) - 1):
+            for first_value, first_calories in lines[index:]:
+                for second_value, second_calories in lines[index:]:
+                    if first_calories < second_calories:
+                        calorie_weight = (second_value - first_value) / (second_calories - first_calories)
+                        corner = first_value - calorie_weight * first_calories
+
+                        if all(
+                            value - calorie_weight * ingredient_calories <= corner + 1e-9
+                            for value, ingredient_calories in lines[index:]
+                        ):
+                            calorie_weights.add(calorie_weight)
+
+    cuts = []
+
+    for calorie_weight in sorted(calorie_weights):
+        shifted_values = [
+            value - calorie_weight * ingredient_calories
+            for value, ingredient_calories in zip(values, calories, strict=True)
+        ]
+        cuts.append(
+            (
+                calorie_weight,
+                shifted_values,
+                [max(shifted_values[index:]) for index in range(len(shifted_values))],
+            )
+        )
+
+    return cuts
+
+
+def _get_amounts_around(guide_amount: int, begin: int, end: int) -> Iterable[int]:
+    if begin > end:
+        return
+
+    yield guide_amount
+
+    for offset in range(1, max(guide_amount - begin, end - guide_amount) + 1):
+        if guide_amount + offset <= end:
+            yield guide_amount + offset
+        if guide_amount - offset >= begin:
+            yield guide_amount - offset
+
+
+def _climb_recipe(
+    properties: list[Properties], calories: list[int], target_calories: int | None, total_amount: int
+) -> Quantities:
+    num_ingredients = len(properties)
+    quantities = [
+        total_amount // num_ingredients + (index < total_amount % num_ingredients) for index in range(num_ingredients)
+    ]
+    best_rank = _rank_recipe(properties, calories, target_calories, quantities)
+    step = max(total_amount // (2 * num_ingredients), 1)
+    transfers = list(permutations(range(num_ingredients), 2))
+    moves = [[transfer] for transfer in transfers]
+
+    if target_calories is not None:
+        # Once the recipe meets the target, only pairs of transfers whose calories cancel out keep it there
+        moves += [
+            [first, second]
+            for first in transfers
+            for second in transfers
+            if first != second[::-1]
+            and calories[first[1]] - calories[first[0]] + calories[second[1]] - calories[second[0]] == 0
+        ]
+
+    while True:
+        improved = False
+
+        # Moving step teaspoons from one ingredient to another is kept whenever it ranks the recipe higher
+        for move in moves:
+            candidate = quantities.copy()
+
+            for source, target in move:
+                candidate[source] -= step
+                candidate[target] += step
+
+            if min(candidate) < 0:
+                continue
+
+            candidate_rank = _rank_recipe(properties, calories, target_calories, candidate)
+
+            if candidate_rank > best_rank:
+                quantities, best_rank, improved = candidate, candidate_rank, True
+
+        if not improved:
+            if step == 1:
+                return quantities
+
+            step //= 2
+
+
+def _rank_recipe(
+    properties: list[Properties], calories: list[int], target_calories: int | None, quantities: Quantities
+) -> tuple[int, int, int]:
+    totals = _get_totals(properties, quantities)
+    missing_calories = (
+        0 if target_calories is None else target_calories - sum(map(mul, quantities, calories, strict=True))
+    )
+    # Recipes closer to the target come first, and while every recipe scores 0, raising the worst property leads
+    # towards ones that do not
+    return -abs(missing_calories), _score_totals(totals), min(totals)
+
+
+def _score_totals(totals: Properties) -> int:
+    return prod(max(total, 0) for total in totals)
+
+
+def _get_totals(properties: list[Properties], quantities: Quantities) -> Properties:
+    return tuple(sum(map(mul, values, quantities, strict=True)) for values in zip(*properties, strict=True))
+
+
 def generate_quantities(amount_needed: int, num_ingredients: int) -> Iterable[Quantities]:
     if num_ingredients == 1:
         yield [amount_needed]
@@ -117,6 +612,24 @@ Butterscotch: capacity 0, durability 5, flavor -3, texture 0, calories 3
 Chocolate: capacity 0, durability 0, flavor 5, texture -1, calories 8
 Candy: capacity 0, durability -1, flavor 0, texture 5, calories 8"""
 
+# Too many ingredients for the exhaustive search, so the expected outputs were found by a slower pruned search
+EIGHT_INGREDIENT_INPUT = """A: capacity -2, durability 4, flavor 3, texture -3, calories 6
+B: capacity 4, durability 2, flavor 5, texture 4, calories 2
+C: capacity 4, durability -5, flavor 2, texture -1, calories 9
+D: capacity -2, durability -2, flavor 2, texture 3, calories 9
+E: capacity 2, durability 1, flavor 5, texture -3, calories 4
+F: capacity 5, durability -3, flavor 3, texture 1, calories 1
+G: capacity 5, durability -4, flavor -3, texture 4, calories 1
+H: capacity -1, durability -5, flavor -1, texture 2, calories 7"""
+OTHER_EIGHT_INGREDIENT_INPUT = """A: capacity 0, durability -3, flavor 1, texture 5, calories 1
+B: capacity -4, durability 3, flavor -4, texture 0, calories 1
+C: capacity 3, durability -2, flavor -5, texture -4, calories 7
+D: capacity 1, durability -4, flavor -2, texture -4, calories 9
+E: capacity 1, durability -5, flavor 4, texture -4, calories 4
+F: capacity 5, durability 5, flavor 4, texture -5, calories 7
+G: capacity -5, durability -2, flavor -5, texture 3, calories 3
+H: capacity -1, durability 1, flavor -3, texture 3, calories 2"""
+
 
 @mark.parametrize(("raw_input", "expected_output"), [(EXAMPLE_INPUT, 62842880), (PUZZLE_INPUT, 21367368)])
 def test_get_best_recipe_score(raw_input: str, expected_output: str) -> None:
@@ -126,3 +639,37 @@ def test_get_best_recipe_score(raw_input: str, expected_output: str) -> None:
 @mark.parametrize(("raw_input", "expected_output"), [(EXAMPLE_INPUT, 57600000), (PUZZLE_INPUT, 1766400)])
 def test_get_best_recipe_score_with_target_calories(raw_input: str, expected_output: str) -> None:
     assert get_best_recipe_score(raw_input, 500) == expected_output
+
+
+@mark.parametrize(("raw_input", "expected_output"), [(EXAMPLE_INPUT, 62842880), (PUZZLE_INPUT, 21367368)])
+def test_get_best_recipe_score_pruned(raw_input: str, expected_output: str) -> None:
+    assert get_best_recipe_score_pruned(raw_input, None) == expected_output
+
+
+@mark.parametrize(("raw_input", "expected_output"), [(EXAMPLE_INPUT, 57600000), (PUZZLE_INPUT, 1766400)])
+def test_get_best_recipe_score_pruned_with_target_calories(raw_input: str, expected_output: str) -> None:
+    assert get_best_recipe_score_pruned(raw_input, 500) == expected_output
+
+
+@mark.parametrize("seed", range(10))
+def test_get_best_recipe_score_pruned_matches_exhaustive_search(seed: int) -> None:
+    random = Random(seed)
+    raw_input = "\n".join(
+        f"{chr(ord('A') + index)}: capacity {random.randint(-5, 5)}, durability {random.randint(-5, 5)}, "
+        f"flavor {random.randint(-5, 5)}, texture {random.randint(-5, 5)}, calories {random.randint(1, 9)}"
+        for index in range(random.randint(1, 3))
+    )
+
+    for target_calories in [None, 500, random.randint(100, 900)]:
+        expected_output = get_best_recipe_score(raw_input, target_calories)
+        assert get_best_recipe_score_pruned(raw_input, target_calories) == expected_output
+
+
+@mark.parametrize(
+    ("raw_input", "target_calories", "expected_output"),
+    [(EIGHT_INGREDIENT_INPUT, 500, 926968200), (OTHER_EIGHT_INGREDIENT_INPUT, None, 170546176)],
+)
+def test_get_best_recipe_score_pruned_with_eight_ingredients(
+    raw_input: str, target_calories: int | None, expected_output: int
+) -> None:
+    assert get_best_recipe_score_pruned(raw_input, target_calories) == expected_output
@@ -1,6 +1,15 @@
-from collections.abc import Callable
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
-from os.path import dirname, join
+from enum import Enum
+from itertools import accumulate
+from operator import or_
+from types import MappingProxyType
+
+from pytest import fixture, mark
+
+from input_loader import puzzle_input_path, read_text
 
 AttributeDict = dict[str, int]
 
@@ -50,6 +59,108 @@ def attribute_match_with_ranges(aunt: Aunt, actual_attributes: AttributeDict) ->
     return True
 
 
+class Comparison(Enum):
+    EQUAL = 0
+    GREATER = 1
+    LESS = 2
+
+
+RANGE_COMPARISONS = {
+    "cats": Comparison.GREATER,
+    "trees": Comparison.GREATER,
+    "goldfish": Comparison.LESS,
+    "pomeranians": Comparison.LESS,
+}
+
+# Attributes without a comparison must match exactly
+EXACT_COMPARISONS: Mapping[str, Comparison] = MappingProxyType({})
+
+
+@dataclass
+class AttributeIndex:
+    values: list[int]
+    # Bit n of each bitset is set for the nth aunt
+    bitsets: list[int]
+    below: list[int]
+    above: list[int]
+    unknown: int
+
+
+class AuntIndex:
+    def __init__(self, aunts: list[Aunt]):
+        self._numbers = [aunt.number for aunt in aunts]
+        self._all = (1 << len(aunts)) - 1
+        self._attributes = self._build_attribute_indices(aunts)
+
+    def identify(
+        self, actual_attributes: AttributeDict, comparisons: Mapping[str, Comparison] = EXACT_COMPARISONS
+    ) -> int | None:
+        candidates = self.find_candidates(actual_attributes, comparisons)
+
+        if not candidates:
+            return None
+
+        return self._numbers[(candidates & -candidates).bit_length() - 1]
+
+    def identify_batch(
+        self, queries: list[AttributeDict], comparisons: Mapping[str, Comparison] = EXACT_COMPARISONS
+    ) -> list[int | None]:
+        return [self.identify(actual_attributes, comparisons) for actual_attributes in queries]
+
+    def find_candidates(
+        self, actual_attributes: AttributeDict, comparisons: Mapping[str, Comparison] = EXACT_COMPARISONS
+    ) -> int:
+        candidates = self._all
+
+        for attribute, value in actual_attributes.items():
+            if attribute in self._attributes:
+                comparison = comparisons.get(attribute, Comparison.EQUAL)
+                candidates &= self._get_matching_aunts(self._attributes[attribute], value, comparison)
+
+            if not candidates:
+                break
+
+        return candidates
+
+    def _build_attribute_indices(self, aunts: list[Aunt]) -> dict[str, AttributeIndex]:
+        bitsets_by_attribute: defaultdict[str, defaultdict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+        for position, aunt in enumerate(aunts):
+            for attribute, value in aunt.attributes.items():
+                bitsets_by_attribute[attribute][value] |= 1 << position
+
+        output = {}
+
+        for attribute, bitsets_by_value in bitsets_by_attribute.items():
+            values = sorted(bitsets_by_value)
+            bitsets = [bitsets_by_value[value] for value in values]
+            below = [0, *accumulate(bitsets, or_)]
+            output[attribute] = AttributeIndex(
+                values=values,
+                bitsets=bitsets,
+                below=below,
+                above=[*accumulate(bitsets[::-1], or_)][::-1] + [0],
+                unknown=self._all & ~below[-1],
+            )
+
+        return output
+
+    @staticmethod
+    def _get_matching_aunts(attribute_index: AttributeIndex, value: int, comparison: Comparison) -> int:
+        # Aunts who don't remember an attribute can't be ruled out by it
+        match comparison:
+            case Comparison.EQUAL:
+                position = bisect_left(attribute_index.values, value)
+                found = position < len(attribute_index.values) and attribute_index.values[position] == value
+                matching = attribute_index.bitsets[position] if found else 0
+            case Comparison.GREATER:
+                matching = attribute_index.above[bisect_right(attribute_index.values, value)]
+            case Comparison.LESS:
+                matching = attribute_index.below[bisect_left(attribute_index.values, value)]
+
+        return matching | attribute_index.unknown
+
+
 def parse_aunts(raw_input: str) -> list[Aunt]:
     return [parse_aunt(line) for line in raw_input.splitlines()]
 
@@ -82,14 +193,49 @@ ACTUAL_ATTRIBUTES = {
     "cars": 2,
     "perfumes": 1,
 }
-REMEMBERED_ATTRIBUTES = open(join(dirname(__file__), "puzzle_input.txt")).read()
 
 
-def test_identify_aunt():
-    aunts = parse_aunts(REMEMBERED_ATTRIBUTES)
-    assert identify_aunt(ACTUAL_ATTRIBUTES, aunts, simple_attribute_match) == 103
+@fixture
+def remembered_aunts() -> list[Aunt]:
+    return parse_aunts(read_text(puzzle_input_path(__file__)))
+
+
+def test_identify_aunt(remembered_aunts: list[Aunt]):
+    assert identify_aunt(ACTUAL_ATTRIBUTES, remembered_aunts, simple_attribute_match) == 103
+
+
+def test_identify_aunt_with_ranges(remembered_aunts: list[Aunt]):
+    assert identify_aunt(ACTUAL_ATTRIBUTES, remembered_aunts, attribute_match_with_ranges) == 405
+
+
+def test_aunt_index_identify(remembered_aunts: list[Aunt]):
+    aunt_index = AuntIndex(remembered_aunts)
+    assert aunt_index.identify(ACTUAL_ATTRIBUTES) == 103
+
+
+def test_aunt_index_identify_with_ranges(remembered_aunts: list[Aunt]):
+    aunt_index = AuntIndex(remembered_aunts)
+    assert aunt_index.identify(ACTUAL_ATTRIBUTES, RANGE_COMPARISONS) == 405
+
+
+@mark.parametrize(
+    ("comparisons", "attribute_matcher"),
+    [({}, simple_attribute_match), (RANGE_COMPARISONS, attribute_match_with_ranges)],
+)
+def test_aunt_index_identify_batch(
+    remembered_aunts: list[Aunt], comparisons: Mapping[str, Comparison], attribute_matcher: AttributeMatcher
+) -> None:
+    queries = [{"cats": cats, "trees": 3, "children": children} for cats in range(10) for children in range(10)]
+    expected_output = [
+        next((aunt.number for aunt in remembered_aunts if attribute_matcher(aunt, query)), None) for query in queries
+    ]
+
+    assert AuntIndex(remembered_aunts).identify_batch(queries, comparisons) == expected_output
 
 
-def test_identify_aunt_with_ranges():
-    aunts = parse_aunts(REMEMBERED_ATTRIBUTES)
-    assert identify_aunt(ACTUAL_ATTRIBUTES, aunts, attribute_match_with_ranges) == 405
+def test_aunt_index_identify_without_match():
+    aunt_index = AuntIndex([Aunt(number=1, attributes={"cats": 1}), Aunt(number=2, attributes={"cats": 2})])
+    assert aunt_index.identify({"cats": 3}) is None
+    assert aunt_index.identify({"cats": 3}, RANGE_COMPARISONS) is None
+    assert aunt_index.identify({"cats": 1}, RANGE_COMPARISONS) == 2
+    assert aunt_index.identify({"dogs": 1}) == 1
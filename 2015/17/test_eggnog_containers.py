@@ -1,3 +1,8 @@
+from itertools import starmap
+from math import comb
+from operator import add
+from random import Random
+
 from pytest import mark
 
 
@@ -37,6 +42,27 @@ def container_combinations(containers: list[int], amount: int) -> list[list[int]
     return output
 
 
+def count_container_combinations_dp(containers: list[int], amount: int) -> tuple[int, int]:
+    # ways[num_used][volume] counts the ways of filling volume exactly with num_used containers
+    ways = [[1] + [0] * amount]
+
+    for capacity in containers:
+        if capacity > amount:
+            continue
+
+        ways.append([0] * (amount + 1))
+
+        for num_used in range(len(ways) - 1, 0, -1):
+            ways[num_used][capacity:] = starmap(
+                add, zip(ways[num_used][capacity:], ways[num_used - 1][: amount + 1 - capacity], strict=True)
+            )
+
+    counts_by_num_used = [row[amount] for row in ways]
+    smallest_count = next((count for count in counts_by_num_used if count), 0)
+
+    return sum(counts_by_num_used), smallest_count
+
+
 EXAMPLE_INPUT = [20, 15, 10, 5, 5]
 PUZZLE_INPUT = [11, 30, 47, 31, 32, 36, 3, 1, 5, 3, 32, 36, 15, 11, 46, 26, 28, 1, 19, 3]
 
@@ -49,3 +75,28 @@ def test_eggnog_containers(containers: list[int], amount: int, expected_output:
 @mark.parametrize(("containers", "amount", "expected_output"), [(EXAMPLE_INPUT, 25, 3), (PUZZLE_INPUT, 150, 4)])
 def test_count_smallest_container_combinations(containers: list[int], amount: int, expected_output: int) -> None:
     assert count_smallest_container_combinations(containers, amount) == expected_output
+
+
+@mark.parametrize(
+    ("containers", "amount", "expected_output"), [(EXAMPLE_INPUT, 25, (4, 3)), (PUZZLE_INPUT, 150, (4372, 4))]
+)
+def test_count_container_combinations_dp(containers: list[int], amount: int, expected_output: tuple[int, int]) -> None:
+    assert count_container_combinations_dp(containers, amount) == expected_output
+
+
+@mark.parametrize("seed", range(10))
+def test_count_container_combinations_dp_matches_enumeration(seed: int) -> None:
+    random = Random(seed)
+    containers = [random.randint(1, 20) for _ in range(random.randint(0, 12))]
+    amount = random.randint(0, 60)
+    expected_output = (
+        count_container_combinations(containers, amount),
+        count_smallest_container_combinations(containers, amount),
+    )
+
+    assert count_container_combinations_dp(containers, amount) == expected_output
+
+
+def test_count_container_combinations_dp_scales() -> None:
+    containers = [1] * 100
+    assert count_container_combinations_dp(containers, 50) == (comb(100, 50), comb(100, 50))
@@ -1,7 +1,11 @@
 from collections.abc import Iterable
-from os.path import dirname, join
+from dataclasses import dataclass
+from functools import cache
+from random import Random
 
-from pytest import mark
+from pytest import fixture, mark
+
+from input_loader import puzzle_input_path, read_text
 
 Lights = list[list[bool]]
 
@@ -54,6 +58,86 @@ def stick_corners(lights: Lights) -> Lights:
     ]
 
 
+@dataclass(frozen=True)
+class PackedLights:
+    # Row y occupies bits y * (width + 1) onwards, with an always-off guard bit after each row so that shifting by one
+    # never carries a light into the neighbouring row
+    bits: int
+    width: int
+    height: int
+
+
+def pack_lights(lights: Lights) -> PackedLights:
+    width = len(lights[0])
+    bits = sum(1 << (y * (width + 1) + x) for y, row in enumerate(lights) for x, value in enumerate(row) if value)
+    return PackedLights(bits=bits, width=width, height=len(lights))
+
+
+def unpack_lights(packed: PackedLights) -> Lights:
+    stride = packed.width + 1
+    return [[bool(packed.bits >> (y * stride + x) & 1) for x in range(packed.width)] for y in range(packed.height)]
+
+
+def update_packed_lights(packed: PackedLights) -> PackedLights:
+    stride = packed.width + 1
+    bits = packed.bits
+    neighbours = [
+        bits << 1,
+        bits >> 1,
+        bits << stride,
+        bits >> stride,
+        bits << (stride - 1),
+        bits << (stride + 1),
+        bits >> (stride - 1),
+        bits >> (stride + 1),
+    ]
+    # Bit-sliced adder over the eight neighbours; fours records a count of at least four
+    ones = twos = fours = 0
+
+    for neighbour in neighbours:
+        ones_carry = ones & neighbour
+        ones ^= neighbour
+        fours |= twos & ones_carry
+        twos ^= ones_carry
+
+    new_bits = twos & ~fours & (ones | bits) & _get_grid_mask(packed.width, packed.height)
+
+    return PackedLights(bits=new_bits, width=packed.width, height=packed.height)
+
+
+def stick_packed_corners(packed: PackedLights) -> PackedLights:
+    return PackedLights(
+        bits=packed.bits | _get_corner_mask(packed.width, packed.height), width=packed.width, height=packed.height
+    )
+
+
+def count_lights_after_steps(raw_input: str, num_steps: int, stuck_corners: bool) -> int:
+    packed = pack_lights(parse_input(raw_input))
+
+    if stuck_corners:
+        packed = stick_packed_corners(packed)
+
+    for _ in range(num_steps):
+        packed = update_packed_lights(packed)
+
+        if stuck_corners:
+            packed = stick_packed_corners(packed)
+
+    return packed.bits.bit_count()
+
+
+@cache
+def _get_grid_mask(width: int, height: int) -> int:
+    row_mask = (1 << width) - 1
+    return sum(row_mask << (y * (width + 1)) for y in range(height))
+
+
+@cache
+def _get_corner_mask(width: int, height: int) -> int:
+    last_row = (height - 1) * (width + 1)
+    return 1 | 1 << (width - 1) | 1 << last_row | 1 << (last_row + width - 1)
+
+
 EXAMPLE_INPUT = """.#.#.#
 ...##.
 #....#
@@ -61,7 +145,10 @@ EXAMPLE_INPUT = """.#.#.#
 #.#..#
 ####.."""
 
-PUZZLE_INPUT = open(join(dirname(__file__), "puzzle_input.txt")).read()
+
+@fixture
+def puzzle_input() -> str:
+    return read_text(puzzle_input_path(__file__))
 
 
 def test_parse_input():
@@ -87,7 +174,7 @@ def test_update_lights():
     ]
 
 
-@mark.parametrize(("raw_input", "num_steps", "num_lights_expected"), [(EXAMPLE_INPUT, 4, 4), (PUZZLE_INPUT, 100, 814)])
+@mark.parametrize(("raw_input", "num_steps", "num_lights_expected"), [(EXAMPLE_INPUT, 4, 4)])
 def test_update_lights_steps(raw_input: str, num_steps: int, num_lights_expected: int) -> None:
     lights = parse_input(raw_input)
 
@@ -99,7 +186,7 @@ def test_update_lights_steps(raw_input: str, num_steps: int, num_lights_expected
     assert num_lights_on == num_lights_expected
 
 
-@mark.parametrize(("raw_input", "num_steps", "num_lights_expected"), [(EXAMPLE_INPUT, 5, 17), (PUZZLE_INPUT, 100, 924)])
+@mark.parametrize(("raw_input", "num_steps", "num_lights_expected"), [(EXAMPLE_INPUT, 5, 17)])
 def test_update_lights_steps_with_stuck_corners(raw_input: str, num_steps: int, num_lights_expected: int) -> None:
     lights = parse_input(raw_input)
     lights = stick_corners(lights)
@@ -111,3 +198,44 @@ def test_update_lights_steps_with_stuck_corners(raw_input: str, num_steps: int,
     num_lights_on = sum(sum(1 if value else 0 for value in row) for row in lights)
 
     assert num_lights_on == num_lights_expected
+
+
+def test_pack_lights_round_trip():
+    lights = parse_input(EXAMPLE_INPUT)
+    assert unpack_lights(pack_lights(lights)) == lights
+
+
+@mark.parametrize("stuck_corners", [False, True])
+@mark.parametrize("seed", range(5))
+def test_update_packed_lights_matches_update_lights(seed: int, stuck_corners: bool) -> None:
+    random = Random(seed)
+    width = random.randint(1, 12)
+    lights = [[random.random() < 0.4 for _ in range(width)] for _ in range(random.randint(1, 12))]
+    packed = pack_lights(lights)
+
+    for _ in range(5):
+        lights = update_lights(lights)
+        packed = update_packed_lights(packed)
+
+        if stuck_corners:
+            lights = stick_corners(lights)
+            packed = stick_packed_corners(packed)
+
+        assert unpack_lights(packed) == lights
+
+
+@mark.parametrize(("raw_input", "num_steps", "num_lights_expected"), [(EXAMPLE_INPUT, 4, 4)])
+def test_count_lights_after_steps(raw_input: str, num_steps: int, num_lights_expected: int) -> None:
+    assert count_lights_after_steps(raw_input, num_steps, stuck_corners=False) == num_lights_expected
+
+
+@mark.parametrize(("raw_input", "num_steps", "num_lights_expected"), [(EXAMPLE_INPUT, 5, 17)])
+def test_count_lights_after_steps_with_stuck_corners(raw_input: str, num_steps: int, num_lights_expected: int) -> None:
+    assert count_lights_after_steps(raw_input, num_steps, stuck_corners=True) == num_lights_expected
+
+
+@mark.parametrize(("stuck_corners", "num_lights_expected"), [(False, 814), (True, 924)])
+def test_count_lights_after_steps_puzzle_input(
+    puzzle_input: str, stuck_corners: bool, num_lights_expected: int
+) -> None:
+    assert count_lights_after_steps(puzzle_input, 100, stuck_corners) == num_lights_expected
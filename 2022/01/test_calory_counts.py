@@ -1,10 +1,20 @@
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from heapq import nlargest
+from io import StringIO
+from itertools import chain
+from mmap import mmap
+from os import cpu_count
+from pathlib import Path
+
 from pytest import mark
 
+from input_loader import map_input
+
 
 def get_calories_of_max_n_elves(calory_input: str, n: int) -> int:
     lines = calory_input.split("\n")
     calory_counts = sorted(_parse_lines(lines))
-    print(f"{calory_counts=}")
     return sum(calory_counts[-n:])
 
 
@@ -22,6 +32,66 @@ def _parse_lines(lines: list[str]) -> list[int]:
     return output
 
 
+DEFAULT_CHUNK_SIZE = 1 << 24
+
+
+def get_calories_of_max_n_elves_streaming(lines: Iterable[str], n: int) -> int:
+    # nlargest keeps a heap of the n best totals seen so far, so nothing else is held in memory
+    return sum(nlargest(n, _iter_elf_totals(lines)))
+
+
+def get_calories_of_max_n_elves_parallel(
+    path: str, n: int, max_workers: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    with map_input(path) as data:
+        boundaries = _get_chunk_boundaries(data, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=max_workers or cpu_count() or 1) as executor:
+        chunk_maxima = executor.map(
+            _get_max_n_totals_in_range,
+            [path] * (len(boundaries) - 1),
+            [n] * (len(boundaries) - 1),
+            boundaries,
+            boundaries[1:],
+        )
+        return sum(nlargest(n, chain.from_iterable(chunk_maxima)))
+
+
+def _iter_elf_totals(lines: Iterable[str]) -> Iterator[int]:
+    current_total = 0
+    has_items = False
+
+    for line in lines:
+        if line := line.strip():
+            current_total += int(line)
+            has_items = True
+        elif has_items:
+            yield current_total
+            current_total = 0
+            has_items = False
+
+    if has_items:
+        yield current_total
+
+
+def _get_chunk_boundaries(data: bytes | mmap, chunk_size: int) -> list[int]:
+    boundaries = [0]
+
+    while boundaries[-1] < len(data):
+        # Chunks only end on a blank line, so no elf is split between two workers
+        end = data.find(b"\n\n", boundaries[-1] + chunk_size)
+        boundaries.append(len(data) if end == -1 else end + 1)
+
+    return boundaries
+
+
+def _get_max_n_totals_in_range(path: str, n: int, begin: int, end: int) -> list[int]:
+    with map_input(path) as data:
+        lines = str(data[begin:end], "utf-8").splitlines()
+
+    return nlargest(n, _iter_elf_totals(lines))
+
+
 EXAMPLE_INPUT = """1000
 2000
 3000
@@ -2293,3 +2363,36 @@ def test_get_calories_of_max_elf(actual_input: str, expected_output: int) -> Non
 @mark.parametrize(("actual_input", "expected_output"), [(EXAMPLE_INPUT, 41000), (PUZZLE_INPUT, 207968)])
 def test_get_calories_of_max_3_elves(actual_input: str, expected_output: int) -> None:
     assert get_calories_of_max_n_elves(actual_input, 3) == expected_output
+
+
+@mark.parametrize(("actual_input", "expected_output"), [(EXAMPLE_INPUT, 24000), (PUZZLE_INPUT, 69836)])
+def test_get_calories_of_max_elf_streaming(actual_input: str, expected_output: int) -> None:
+    assert get_calories_of_max_n_elves_streaming(StringIO(actual_input), 1) == expected_output
+
+
+# Unlike get_calories_of_max_n_elves, the last elf is counted even without a trailing blank line
+@mark.parametrize(("actual_input", "expected_output"), [(EXAMPLE_INPUT, 45000), (PUZZLE_INPUT, 207968)])
+def test_get_calories_of_max_3_elves_streaming(actual_input: str, expected_output: int) -> None:
+    assert get_calories_of_max_n_elves_streaming(StringIO(actual_input), 3) == expected_output
+
+
+@mark.parametrize(("n", "expected_output"), [(1, 5), (2, 6), (1000, 6)])
+def test_get_calories_of_max_n_elves_streaming_includes_last_elf(n: int, expected_output: int) -> None:
+    assert get_calories_of_max_n_elves_streaming(StringIO("1\n\n\n2\n3"), n) == expected_output
+
+
+@mark.parametrize(("max_workers", "chunk_size"), [(1, DEFAULT_CHUNK_SIZE), (2, 1), (3, 100), (4, 5000)])
+@mark.parametrize("n", [1, 3])
+def test_get_calories_of_max_n_elves_parallel(tmp_path: Path, n: int, max_workers: int, chunk_size: int) -> None:
+    path = tmp_path / "calories.txt"
+    path.write_text(PUZZLE_INPUT)
+    expected_output = get_calories_of_max_n_elves_streaming(StringIO(PUZZLE_INPUT), n)
+
+    assert get_calories_of_max_n_elves_parallel(str(path), n, max_workers, chunk_size) == expected_output
+
+
+def test_get_calories_of_max_n_elves_parallel_empty_input(tmp_path: Path) -> None:
+    path = tmp_path / "calories.txt"
+    path.write_text("")
+
+    assert get_calories_of_max_n_elves_parallel(str(path), 3) == 0
@@ -1,7 +1,9 @@
 from collections.abc import Iterable
 from enum import Enum
+from itertools import starmap
+from operator import mul
 
-from pytest import mark
+from pytest import mark, raises
 
 
 class Choice(Enum):
@@ -99,6 +101,40 @@ def _get_player_score(opponent_choice: Choice, player_choice: Choice) -> int:
                     return 3
 
 
+def _get_round_scores() -> dict[bytes, tuple[int, int]]:
+    round_scores = {}
+
+    for opponent, opponent_choice in OPPONENT_LOOKUP.items():
+        for player, player_choice in PLAYER_LOOKUP.items():
+            decrypted_choice = _get_player_choice(player, opponent_choice)
+            round_scores[f"{opponent} {player}".encode("ascii")] = (
+                CHOICE_SCORE[player_choice] + _get_player_score(opponent_choice, player_choice),
+                CHOICE_SCORE[decrypted_choice] + _get_player_score(opponent_choice, decrypted_choice),
+            )
+
+    return round_scores
+
+
+ROUND_SCORES = _get_round_scores()
+ROUND_PATTERNS = list(ROUND_SCORES)
+SCORE_TABLE = [score for score, _ in ROUND_SCORES.values()]
+DECRYPTED_SCORE_TABLE = [score for _, score in ROUND_SCORES.values()]
+
+
+def score_strategy_guide(guide: bytes) -> tuple[int, int]:
+    # Every round is one of nine three-byte lines, so both strategies are a dot product of the line counts
+    round_counts = [guide.count(pattern) for pattern in ROUND_PATTERNS]
+
+    # Each round plus its separator is four bytes, so anything else in the buffer means a malformed line
+    if len(guide.rstrip(b"\n")) + 1 != 4 * sum(round_counts):
+        raise RuntimeError("Found unexpected rounds in strategy guide")
+
+    return (
+        sum(starmap(mul, zip(round_counts, SCORE_TABLE, strict=True))),
+        sum(starmap(mul, zip(round_counts, DECRYPTED_SCORE_TABLE, strict=True))),
+    )
+
+
 def _parse_input(input_string: str) -> Guide:
     for line in input_string.split("\n"):
         chars = line.split(" ")
@@ -2618,3 +2654,25 @@ def test_rock_paper_scissors(input_string: str, expected_output: int) -> None:
 @mark.parametrize(("input_string", "expected_output"), [(EXAMPLE_INPUT, 12), (PUZZLE_INPUT, 13889)])
 def test_rock_paper_scissors_with_decryption(input_string: str, expected_output: int) -> None:
     assert rock_paper_scissors_with_decryption(input_string) == expected_output
+
+
+@mark.parametrize(
+    ("input_string", "expected_output"),
+    [(EXAMPLE_INPUT, (15, 12)), (EXAMPLE_INPUT + "\n", (15, 12)), (PUZZLE_INPUT, (14827, 13889))],
+)
+def test_score_strategy_guide(input_string: str, expected_output: tuple[int, int]) -> None:
+    assert score_strategy_guide(input_string.encode("ascii")) == expected_output
+
+
+@mark.parametrize("round_pattern", ROUND_PATTERNS)
+def test_score_strategy_guide_single_round(round_pattern: bytes) -> None:
+    input_string = round_pattern.decode("ascii")
+    expected_output = (rock_paper_scissors(input_string), rock_paper_scissors_with_decryption(input_string))
+
+    assert score_strategy_guide(round_pattern) == expected_output
+
+
+@mark.parametrize("guide", [b"A Y\nD X", b"A Y\n\nB Z", b"A  Y", b"AY"])
+def test_score_strategy_guide_rejects_malformed_rounds(guide: bytes) -> None:
+    with raises(RuntimeError):
+        score_strategy_guide(guide)
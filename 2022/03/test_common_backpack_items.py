@@ -1,6 +1,8 @@
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
+from random import Random
+from string import ascii_letters
 
-from pytest import mark
+from pytest import fixture, mark, raises
 
 
 def get_sum_of_group_common_items(groups: Iterable[tuple[str, ...]]) -> int:
@@ -34,6 +36,43 @@ def _get_priority_of_item(misplaced_item: str) -> int:
     raise RuntimeError(f"Unexpected {misplaced_item=} found")
 
 
+ITEM_PRIORITIES = [_get_priority_of_item(chr(byte)) if chr(byte) in ascii_letters else 0 for byte in range(256)]
+
+GROUP_SIZE = 3
+
+
+def get_item_priority_sums(backpacks: bytes) -> tuple[int, int]:
+    lines = backpacks.split()
+
+    if len(lines) % GROUP_SIZE:
+        raise RuntimeError("Found incomplete group of backpacks")
+
+    misplaced_total = 0
+
+    for backpack in lines:
+        split_point = len(backpack) // 2
+        misplaced_total += _get_priority_of_items(_get_common_items(backpack[:split_point], backpack[split_point:]))
+
+    badge_total = 0
+
+    for first, second, third in zip(*[iter(lines)] * GROUP_SIZE, strict=True):
+        badge_total += _get_priority_of_items(_get_common_items(_get_common_items(first, second), third))
+
+    return misplaced_total, badge_total
+
+
+def _get_common_items(first: bytes, second: bytes) -> bytes:
+    # Deleting the items missing from second leaves the common ones, without building a set per compartment
+    return first.translate(None, first.translate(None, second))
+
+
+def _get_priority_of_items(items: bytes) -> int:
+    if not items or items.count(items[0]) != len(items) or not ITEM_PRIORITIES[items[0]]:
+        raise RuntimeError(f"Expected exactly one common item, found {items=}")
+
+    return ITEM_PRIORITIES[items[0]]
+
+
 def _parse_compartments_by_backpack(input_string: str) -> Iterable[tuple[str, str]]:
     for line in input_string.split("\n"):
         split_point = len(line) // 2
@@ -56,6 +95,39 @@ def _parse_backpacks_by_group(input_string: str) -> Iterable[tuple[str, ...]]:
     assert not current_group
 
 
+def _get_item_priority_sums_with_sets(backpacks: bytes) -> tuple[int, int]:
+    input_string = backpacks.decode("ascii")
+    return (
+        get_sum_of_group_common_items(_parse_compartments_by_backpack(input_string)),
+        get_sum_of_group_common_items(_parse_backpacks_by_group(input_string)),
+    )
+
+
+def _generate_manifest(num_groups: int, compartment_size: int, seed: int) -> bytes:
+    random = Random(seed)
+    lines = []
+
+    for _ in range(num_groups):
+        badge, *other_items = random.sample(ascii_letters, len(ascii_letters))
+
+        # Each backpack draws from its own third of the other items, so only the badge is common to the group
+        for pool in (other_items[0:17], other_items[17:34], other_items[34:51]):
+            misplaced_item, *pool = pool
+            first_items = [misplaced_item, badge, *pool[:8]]
+            second_items = [misplaced_item, *pool[8:]]
+            first_compartment = first_items + random.choices(first_items, k=compartment_size - len(first_items))
+            second_compartment = second_items + random.choices(second_items, k=compartment_size - len(second_items))
+            random.shuffle(first_compartment)
+            random.shuffle(second_compartment)
+            lines.append("".join(first_compartment + second_compartment))
+
+    return "\n".join(lines).encode("ascii")
+
+
+# Three lines per group, so a scale of 100 gives a manifest of a million lines
+BENCHMARK_NUM_GROUPS = 3_400
+
+
 EXAMPLE_INPUT = """vJrwpWtwJgWrhcsFMMfFFhFp
 jqHRNqRjqzjGDLGLrsFMfFZSrLrFZsSL
 PmmdzqPrVvPwwTWBwg
@@ -376,3 +448,36 @@ def test_get_sum_of_incorrect_item_priorities(input_string: str, expected_output
 def test_get_sum_of_group_common_items(input_string: str, expected_output: int) -> None:
     backpacks_by_group = _parse_backpacks_by_group(input_string)
     assert get_sum_of_group_common_items(backpacks_by_group) == expected_output
+
+
+@mark.parametrize(
+    ("input_string", "expected_output"),
+    [(EXAMPLE_INPUT, (157, 70)), (EXAMPLE_INPUT + "\n", (157, 70)), (PUZZLE_INPUT, (8252, 2828))],
+)
+def test_get_item_priority_sums(input_string: str, expected_output: tuple[int, int]) -> None:
+    assert get_item_priority_sums(input_string.encode("ascii")) == expected_output
+
+
+@mark.parametrize(("num_groups", "compartment_size"), [(1, 10), (10, 16), (1000, 24)])
+def test_get_item_priority_sums_generated_manifest(num_groups: int, compartment_size: int) -> None:
+    manifest = _generate_manifest(num_groups, compartment_size, seed=num_groups)
+    assert get_item_priority_sums(manifest) == _get_item_priority_sums_with_sets(manifest)
+
+
+@mark.parametrize("backpacks", [b"abab\ncdcd", b"abcb\nadae\nafag\nahai", b"abcd\nxaxa\nyaya", b"acbc\nadbd\naebe"])
+def test_get_item_priority_sums_rejects_invalid_manifest(backpacks: bytes) -> None:
+    with raises(RuntimeError):
+        get_item_priority_sums(backpacks)
+
+
+@fixture(scope="module")
+def benchmark_manifest(benchmark_scale: int) -> bytes:
+    return _generate_manifest(BENCHMARK_NUM_GROUPS * benchmark_scale, compartment_size=16, seed=0)
+
+
+@mark.benchmark
+@mark.parametrize(
+    "get_priority_sums", [_get_item_priority_sums_with_sets, get_item_priority_sums], ids=["sets", "translate"]
+)
+def test_benchmark_item_priority_sums(benchmark_manifest: bytes, get_priority_sums: Callable[[bytes], object]) -> None:
+    get_priority_sums(benchmark_manifest)
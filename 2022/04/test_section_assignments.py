@@ -1,8 +1,12 @@
+import re
+from array import array
 from collections.abc import Callable, Iterable
 from dataclasses import dataclass
 from functools import partial
+from itertools import repeat, starmap
+from operator import and_, le, mul, sub
 
-from pytest import mark
+from pytest import mark, raises
 
 
 @dataclass
@@ -51,6 +55,30 @@ count_section_assignments_with_partial_overlap = partial(
 )
 
 
+def count_section_assignment_overlaps_columnar(input_string: str) -> tuple[int, int]:
+    first_begins, first_ends, second_begins, second_ends = _parse_input_columnar(input_string)
+
+    # One range contains the other exactly when their begins and ends are ordered in opposite directions, or tie
+    begin_differences = starmap(sub, zip(first_begins, second_begins, strict=True))
+    end_differences = starmap(sub, zip(first_ends, second_ends, strict=True))
+    full_overlaps = map(le, starmap(mul, zip(begin_differences, end_differences, strict=True)), repeat(0))
+
+    first_begins_before_second_ends = starmap(le, zip(first_begins, second_ends, strict=True))
+    second_begins_before_first_ends = starmap(le, zip(second_begins, first_ends, strict=True))
+    partial_overlaps = starmap(and_, zip(first_begins_before_second_ends, second_begins_before_first_ends, strict=True))
+
+    return sum(full_overlaps), sum(partial_overlaps)
+
+
+def _parse_input_columnar(input_string: str) -> tuple[array, array, array, array]:
+    bounds = array("q", map(int, re.findall(r"\d+", input_string)))
+
+    if len(bounds) % 4:
+        raise RuntimeError(f"Expected four bounds per line, found {len(bounds)} in total")
+
+    return bounds[0::4], bounds[1::4], bounds[2::4], bounds[3::4]
+
+
 def _parse_input(input_string: str) -> Iterable[tuple[Range, Range]]:
     for line in input_string.split("\n"):
         range_strings = line.split(",")
@@ -1081,3 +1109,16 @@ def test_count_section_assignments_with_full_overlap(input_string: str, expected
 @mark.parametrize(("input_string", "expected_output"), [(EXAMPLE_INPUT, 4), (PUZZLE_INPUT, 841)])
 def test_count_section_assignments_with_partial_overlap(input_string: str, expected_output: int) -> None:
     assert count_section_assignments_with_partial_overlap(input_string) == expected_output
+
+
+@mark.parametrize(
+    ("input_string", "expected_output"),
+    [(EXAMPLE_INPUT, (2, 4)), (PUZZLE_INPUT, (534, 841)), ("", (0, 0)), ("3-3,3-3\n1-2,3-4\n1-5,5-9", (1, 2))],
+)
+def test_count_section_assignment_overlaps_columnar(input_string: str, expected_output: tuple[int, int]) -> None:
+    assert count_section_assignment_overlaps_columnar(input_string) == expected_output
+
+
+def test_count_section_assignment_overlaps_columnar_rejects_incomplete_line() -> None:
+    with raises(RuntimeError):
+        count_section_assignment_overlaps_columnar("2-4,6-8\n2-6,4")
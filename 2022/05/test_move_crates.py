@@ -1,7 +1,9 @@
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from dataclasses import dataclass
+from io import StringIO
+from random import Random
 
-from pytest import mark
+from pytest import mark, raises
 
 
 @dataclass
@@ -43,6 +45,42 @@ def _move_crates_together(crates: list[str], instruction: Instruction) -> None:
     crates[instruction.new_col - 1] = f"{prev}{crates_to_be_moved}"
 
 
+CrateStacks = list[list[str]]
+StackCrateMover = Callable[[CrateStacks, Instruction], None]
+
+
+def move_crate_stacks(crates_string: str, instruction_lines: Iterable[str], crate_mover: StackCrateMover) -> str:
+    # Stacks are mutable lists, so a move costs the number of crates moved rather than the height of the stack
+    stacks = _parse_crate_stacks(crates_string)
+
+    for line in instruction_lines:
+        if line := line.strip():
+            crate_mover(stacks, _parse_instruction(line))
+
+    return "".join(stack[-1] for stack in stacks if stack)
+
+
+def _move_crate_stack_one_by_one(stacks: CrateStacks, instruction: Instruction) -> None:
+    crates_to_be_moved = _remove_top_crates(stacks, instruction)
+    stacks[instruction.new_col - 1].extend(reversed(crates_to_be_moved))
+
+
+def _move_crate_stack_together(stacks: CrateStacks, instruction: Instruction) -> None:
+    crates_to_be_moved = _remove_top_crates(stacks, instruction)
+    stacks[instruction.new_col - 1].extend(crates_to_be_moved)
+
+
+def _remove_top_crates(stacks: CrateStacks, instruction: Instruction) -> list[str]:
+    old_stack = stacks[instruction.old_col - 1]
+
+    if not 0 < instruction.count <= len(old_stack):
+        raise RuntimeError(f"Cannot apply {instruction=} to a stack of {len(old_stack)} crates")
+
+    crates_to_be_moved = old_stack[-instruction.count :]
+    del old_stack[-instruction.count :]
+    return crates_to_be_moved
+
+
 def _parse_crates(crates_string: str) -> list[str]:
     output = list[str]()
 
@@ -64,6 +102,23 @@ def _parse_crates(crates_string: str) -> list[str]:
     return output
 
 
+def _parse_crate_stacks(crates_string: str) -> CrateStacks:
+    stacks = CrateStacks()
+
+    # Reading from the bottom line up lets each crate be appended rather than prepended
+    for line in reversed(crates_string.split("\n")):
+        for col in range(1, len(line), 4):
+            output_col = (col - 1) // 4
+
+            while len(stacks) <= output_col:
+                stacks.append([])
+
+            if line[col] != " ":
+                stacks[output_col].append(line[col])
+
+    return stacks
+
+
 def _parse_instructions(instructions_string: str) -> list[Instruction]:
     return [_parse_instruction(line) for line in instructions_string.split("\n")]
 
@@ -73,6 +128,23 @@ def _parse_instruction(line: str) -> Instruction:
     return Instruction(count=int(tokens[1]), old_col=int(tokens[3]), new_col=int(tokens[5]))
 
 
+def _generate_instructions(crates_string: str, num_instructions: int, seed: int) -> str:
+    random = Random(seed)
+    heights = [len(stack) for stack in _parse_crates(crates_string)]
+    lines = []
+
+    for _ in range(num_instructions):
+        # At least one crate is left on every stack, so every stack has a top crate at the end
+        old_col = random.choice([col for col, height in enumerate(heights) if height > 1])
+        new_col = random.choice([col for col in range(len(heights)) if col != old_col])
+        count = random.randint(1, heights[old_col] - 1)
+        heights[old_col] -= count
+        heights[new_col] += count
+        lines.append(f"move {count} from {old_col + 1} to {new_col + 1}")
+
+    return "\n".join(lines)
+
+
 EXAMPLE_CRATES = """    [D]
 [N] [C]
 [Z] [M] [P]"""
@@ -609,3 +681,55 @@ def test_crate_moving_one_by_one(crates: str, instructions: str, expected_output
 )
 def test_crate_moving_together(crates: str, instructions: str, expected_output: str) -> None:
     assert move_crates(crates, instructions, _move_crates_together) == expected_output
+
+
+@mark.parametrize(
+    ("crates", "instructions", "crate_mover", "expected_output"),
+    [
+        (EXAMPLE_CRATES, EXAMPLE_INSTRUCTIONS, _move_crate_stack_one_by_one, "CMZ"),
+        (PUZZLE_CRATES, PUZZLE_INSTRUCTIONS, _move_crate_stack_one_by_one, "VPCDMSLWJ"),
+        (EXAMPLE_CRATES, EXAMPLE_INSTRUCTIONS, _move_crate_stack_together, "MCD"),
+        (PUZZLE_CRATES, PUZZLE_INSTRUCTIONS, _move_crate_stack_together, "TPWCGNCCG"),
+    ],
+)
+def test_move_crate_stacks(crates: str, instructions: str, crate_mover: StackCrateMover, expected_output: str) -> None:
+    assert move_crate_stacks(crates, StringIO(instructions + "\n"), crate_mover) == expected_output
+
+
+@mark.parametrize(
+    ("crate_mover", "stack_crate_mover"),
+    [(_move_crates_one_by_one, _move_crate_stack_one_by_one), (_move_crates_together, _move_crate_stack_together)],
+)
+@mark.parametrize("seed", range(5))
+def test_move_crate_stacks_matches_move_crates(
+    crate_mover: CrateMover, stack_crate_mover: StackCrateMover, seed: int
+) -> None:
+    instructions = _generate_instructions(PUZZLE_CRATES, 1000, seed)
+    expected_output = move_crates(PUZZLE_CRATES, instructions, crate_mover)
+
+    assert move_crate_stacks(PUZZLE_CRATES, instructions.split("\n"), stack_crate_mover) == expected_output
+
+
+@mark.parametrize(
+    ("crate_mover", "expected_output"), [(_move_crate_stack_one_by_one, "A"), (_move_crate_stack_together, "B")]
+)
+def test_move_crate_stacks_tall_stack(crate_mover: StackCrateMover, expected_output: str) -> None:
+    num_crates = 1_000_000
+    crates = "\n".join(["[B]"] + ["[C]"] * (num_crates - 2) + ["[A] [Z]"])
+    # Moving one by one reverses the moved crates, so after an odd number of moves A is on top instead of B
+    instructions = [f"move {num_crates} from 1 to 2", f"move {num_crates} from 2 to 1"] * 2 + [
+        f"move {num_crates} from 1 to 2"
+    ]
+
+    assert move_crate_stacks(crates, instructions, crate_mover) == expected_output
+
+
+@mark.parametrize("crates", [EXAMPLE_CRATES, PUZZLE_CRATES, "[A]\n[B] [C]\n[D] [E]     [F]"])
+def test_parse_crate_stacks(crates: str) -> None:
+    assert _parse_crate_stacks(crates) == [list(stack) for stack in _parse_crates(crates)]
+
+
+@mark.parametrize("instruction", ["move 4 from 1 to 2", "move 0 from 1 to 2"])
+def test_move_crate_stacks_rejects_impossible_moves(instruction: str) -> None:
+    with raises(RuntimeError):
+        move_crate_stacks(EXAMPLE_CRATES, [instruction], _move_crate_stack_one_by_one)
@@ -0,0 +1,172 @@
+import json
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from collections.abc import Generator, Mapping
+from dataclasses import asdict, dataclass
+from glob import glob
+from os.path import abspath, dirname, join
+from time import perf_counter
+
+import pytest
+
+# Days are found and run from the repository root, so results keep the same node ids from any working directory
+REPOSITORY_ROOT = dirname(abspath(__file__))
+DAY_TEST_GLOB = "20[0-9][0-9]/[0-9][0-9]/test_*.py"
+DEFAULT_OUTPUT = "benchmark_results.json"
+# Synthetic inputs are kept small in the normal test run and grown by this factor when benchmarking
+DEFAULT_SCALE = 100
+DEFAULT_THRESHOLD = 0.2
+# Anything quicker than this is dominated by timer noise, so it is never flagged
+DEFAULT_MIN_WALL_TIME = 0.01
+
+
+@dataclass
+class BenchmarkResult:
+    wall_time: float
+    peak_memory: int | None = None
+    # Blocks still allocated when the test finishes minus those allocated when it started, not an allocation count
+    net_allocated_blocks: int | None = None
+
+
+@dataclass
+class Regression:
+    nodeid: str
+    baseline_wall_time: float
+    wall_time: float
+
+    @property
+    def ratio(self) -> float:
+        return self.wall_time / self.baseline_wall_time
+
+
+class BenchmarkPlugin:
+    def __init__(self, trace_memory: bool):
+        self.trace_memory = trace_memory
+        self.results: dict[str, BenchmarkResult] = {}
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item) -> Generator[None, object, object]:
+        if self.trace_memory:
+            tracemalloc.start()
+            blocks_before = sys.getallocatedblocks()
+
+        begin = perf_counter()
+
+        try:
+            return (yield)
+        finally:
+            result = BenchmarkResult(wall_time=perf_counter() - begin)
+
+            if self.trace_memory:
+                result.peak_memory = tracemalloc.get_traced_memory()[1]
+                result.net_allocated_blocks = sys.getallocatedblocks() - blocks_before
+                tracemalloc.stop()
+
+            self.results[item.nodeid] = result
+
+
+def find_day_directories() -> list[str]:
+    return sorted({dirname(path) for path in glob(DAY_TEST_GLOB, root_dir=REPOSITORY_ROOT)})
+
+
+def run_benchmarks(
+    pytest_args: list[str], trace_memory: bool, scale: int, benchmarks_only: bool
+) -> tuple[int, dict[str, BenchmarkResult]]:
+    plugin = BenchmarkPlugin(trace_memory)
+    marker_args = ["-m", "benchmark"] if benchmarks_only else []
+    exit_code = pytest.main(
+        [
+            "-q",
+            "-p",
+            "no:cacheprovider",
+            f"--rootdir={REPOSITORY_ROOT}",
+            f"--benchmark-scale={scale}",
+            *marker_args,
+            *(pytest_args or [join(REPOSITORY_ROOT, day_directory) for day_directory in find_day_directories()]),
+        ],
+        plugins=[plugin],
+    )
+    return exit_code, plugin.results
+
+
+def find_regressions(
+    baseline: Mapping[str, BenchmarkResult],
+    results: Mapping[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_wall_time: float = DEFAULT_MIN_WALL_TIME,
+) -> list[Regression]:
+    regressions = [
+        Regression(nodeid, baseline[nodeid].wall_time, result.wall_time)
+        for nodeid, result in results.items()
+        if nodeid in baseline
+        and max(baseline[nodeid].wall_time, result.wall_time) >= min_wall_time
+        and result.wall_time > baseline[nodeid].wall_time * (1 + threshold)
+    ]
+
+    return sorted(regressions, key=lambda regression: regression.ratio, reverse=True)
+
+
+def load_results(path: str) -> tuple[int, dict[str, BenchmarkResult]]:
+    with open(path) as file:
+        contents = json.load(file)
+
+    return contents["scale"], {nodeid: BenchmarkResult(**result) for nodeid, result in contents["results"].items()}
+
+
+def save_results(path: str, scale: int, results: Mapping[str, BenchmarkResult]) -> None:
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "python": sys.version,
+                "scale": scale,
+                "results": {nodeid: asdict(result) for nodeid, result in results.items()},
+            },
+            file,
+            indent=2,
+        )
+
+
+def main() -> int:
+    parser = ArgumentParser(description="Time every day's tests and flag slowdowns against a previous run")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the results as JSON")
+    parser.add_argument("--baseline", help="results JSON from a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative slowdown to flag")
+    parser.add_argument("--min-wall-time", type=float, default=DEFAULT_MIN_WALL_TIME)
+    parser.add_argument("--memory", action="store_true", help="record peak memory and allocations (slower)")
+    parser.add_argument("--scale", type=int, default=DEFAULT_SCALE, help="size multiplier for synthetic inputs")
+    parser.add_argument("--benchmarks-only", action="store_true", help="only run tests marked as benchmarks")
+    parser.add_argument("pytest_args", nargs="*", help="paths or options passed to pytest, default all days")
+    args = parser.parse_args()
+
+    exit_code, results = run_benchmarks(args.pytest_args, args.memory, args.scale, args.benchmarks_only)
+
+    # Timings from a failing run are not saved, so they can never become a baseline
+    if exit_code != pytest.ExitCode.OK:
+        print(f"pytest exited with {exit_code}, results not saved", file=sys.stderr)
+        return int(exit_code)
+
+    save_results(args.output, args.scale, results)
+
+    if args.baseline is None:
+        return 0
+
+    baseline_scale, baseline = load_results(args.baseline)
+
+    if baseline_scale != args.scale:
+        print(f"Baseline was run at scale {baseline_scale}, not {args.scale}", file=sys.stderr)
+        return 2
+
+    regressions = find_regressions(baseline, results, args.threshold, args.min_wall_time)
+
+    for regression in regressions:
+        print(
+            f"SLOWER {regression.nodeid}: {regression.baseline_wall_time:.3f}s -> {regression.wall_time:.3f}s "
+            f"({regression.ratio:.2f}x)"
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+from pytest import FixtureRequest, Parser, fixture
+
+DEFAULT_BENCHMARK_SCALE = 1
+
+
+def pytest_addoption(parser: Parser) -> None:
+    parser.addoption(
+        "--benchmark-scale",
+        type=int,
+        default=DEFAULT_BENCHMARK_SCALE,
+        help="multiplier for the size of the synthetic inputs used by benchmark tests",
+    )
+
+
+@fixture(scope="session")
+def benchmark_scale(request: FixtureRequest) -> int:
+    return request.config.getoption("--benchmark-scale")
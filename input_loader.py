@@ -0,0 +1,91 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from mmap import ACCESS_READ, mmap
+from os import stat
+from os.path import dirname, join
+from typing import cast
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# A file is identified by its path, size and modification time, so a rewritten file is hashed again
+FileKey = tuple[str, int, int]
+
+_HASHES: dict[FileKey, str] = {}
+# Decoded and parsed forms are keyed by the hash of the file contents, so each input is only decoded and parsed once
+_TEXTS: dict[str, str] = {}
+_PARSED_INPUTS: dict[tuple[str, Callable], object] = {}
+
+
+def puzzle_input_path(module_file: str, name: str = "puzzle_input.txt") -> str:
+    return join(dirname(module_file), name)
+
+
+@contextmanager
+def map_input(path: str) -> Iterator[mmap | bytes]:
+    with open(path, "rb") as file:
+        try:
+            data = mmap(file.fileno(), 0, access=ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be memory-mapped
+            yield b""
+            return
+
+        with data:
+            yield data
+
+
+def get_input_hash(path: str) -> str:
+    file_key = _get_file_key(path)
+
+    if file_key not in _HASHES:
+        # hashlib pulls in OpenSSL, which would otherwise dominate the cost of importing a day module
+        from hashlib import sha256
+
+        with map_input(path) as data:
+            _HASHES[file_key] = sha256(data).hexdigest()
+
+    return _HASHES[file_key]
+
+
+def read_text(path: str) -> str:
+    input_hash = get_input_hash(path)
+
+    if input_hash not in _TEXTS:
+        with map_input(path) as data:
+            _TEXTS[input_hash] = str(data, "utf-8")
+
+    return _TEXTS[input_hash]
+
+
+def load_parsed[T](path: str, parser: Callable[[str], T]) -> T:
+    key = (get_input_hash(path), parser)
+
+    if key not in _PARSED_INPUTS:
+        _PARSED_INPUTS[key] = parser(read_text(path))
+
+    return cast(T, _PARSED_INPUTS[key])
+
+
+def iter_lines(path: str) -> Iterator[str]:
+    with map_input(path) as data:
+        begin = 0
+
+        while begin < len(data):
+            end = data.find(b"\n", begin)
+
+            if end == -1:
+                end = len(data)
+
+            yield str(data[begin:end], "utf-8")
+            begin = end + 1
+
+
+def iter_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    with map_input(path) as data:
+        for begin in range(0, len(data), chunk_size):
+            yield data[begin : begin + chunk_size]
+
+
+def _get_file_key(path: str) -> FileKey:
+    file_stat = stat(path)
+    return path, file_stat.st_size, file_stat.st_mtime_ns
@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+
+from pytest import ExitCode, MonkeyPatch
+
+import benchmark
+from benchmark import BenchmarkResult, find_day_directories, find_regressions, load_results, save_results
+
+
+def test_find_day_directories() -> None:
+    day_directories = find_day_directories()
+
+    assert "2015/01" in day_directories
+    assert "2025/08" in day_directories
+    assert day_directories == sorted(day_directories)
+
+
+def test_find_day_directories_from_other_directory(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    expected_output = find_day_directories()
+    monkeypatch.chdir(tmp_path)
+
+    assert find_day_directories() == expected_output
+
+
+def test_run_benchmarks_from_other_directory(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    pytest_args: list[str] = []
+
+    def run_pytest(args: list[str], plugins: list[object]) -> ExitCode:
+        pytest_args.extend(args)
+        return ExitCode.OK
+
+    monkeypatch.setattr(benchmark.pytest, "main", run_pytest)
+    monkeypatch.chdir(tmp_path)
+    benchmark.run_benchmarks([], trace_memory=False, scale=1, benchmarks_only=False)
+
+    assert f"--rootdir={benchmark.REPOSITORY_ROOT}" in pytest_args
+    assert str(Path(benchmark.REPOSITORY_ROOT) / "2015" / "01") in pytest_args
+
+
+def test_find_regressions() -> None:
+    baseline = {
+        "slower": BenchmarkResult(wall_time=1.0),
+        "within_threshold": BenchmarkResult(wall_time=1.0),
+        "too_quick": BenchmarkResult(wall_time=0.001),
+        "faster": BenchmarkResult(wall_time=1.0),
+        "much_slower": BenchmarkResult(wall_time=1.0),
+    }
+    results = {
+        "slower": BenchmarkResult(wall_time=1.5),
+        "within_threshold": BenchmarkResult(wall_time=1.1),
+        "too_quick": BenchmarkResult(wall_time=0.005),
+        "faster": BenchmarkResult(wall_time=0.5),
+        "much_slower": BenchmarkResult(wall_time=3.0),
+        "new": BenchmarkResult(wall_time=10.0),
+    }
+
+    assert [regression.nodeid for regression in find_regressions(baseline, results, threshold=0.2)] == [
+        "much_slower",
+        "slower",
+    ]
+
+
+def test_save_and_load_results(tmp_path: Path) -> None:
+    path = str(tmp_path / "results.json")
+    results = {
+        "2015/01/test_find_floor.py::test_find_floor[(())-0]": BenchmarkResult(0.5, 1024, 3),
+        "2015/04/test_advent_coin.py::test_advent_coin": BenchmarkResult(2.0),
+    }
+    save_results(path, 100, results)
+
+    assert load_results(path) == (100, results)
+
+
+def test_failing_run_is_not_saved(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    path = tmp_path / "results.json"
+    monkeypatch.setattr(benchmark, "run_benchmarks", lambda *_: (ExitCode.TESTS_FAILED, {"a": BenchmarkResult(1.0)}))
+    monkeypatch.setattr(sys, "argv", ["benchmark.py", "--output", str(path)])
+
+    assert benchmark.main() == ExitCode.TESTS_FAILED
+    assert not path.exists()
+
+
+def test_baseline_at_other_scale_is_rejected(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    baseline_path = tmp_path / "baseline.json"
+    save_results(str(baseline_path), 10, {"a": BenchmarkResult(1.0)})
+    monkeypatch.setattr(benchmark, "run_benchmarks", lambda *_: (ExitCode.OK, {"a": BenchmarkResult(1.0)}))
+    monkeypatch.setattr(
+        sys, "argv", ["benchmark.py", "--output", str(tmp_path / "results.json"), "--baseline", str(baseline_path)]
+    )
+
+    assert benchmark.main() == 2
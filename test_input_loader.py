@@ -0,0 +1,86 @@
+from mmap import mmap
+from pathlib import Path
+
+from input_loader import get_input_hash, iter_chunks, iter_lines, load_parsed, map_input, puzzle_input_path, read_text
+
+
+def test_puzzle_input_path() -> None:
+    assert puzzle_input_path("/advent/2015/01/test_find_floor.py") == "/advent/2015/01/puzzle_input.txt"
+    assert puzzle_input_path("/advent/2015/12/test_json_sum.py", "puzzle.json") == "/advent/2015/12/puzzle.json"
+
+
+def test_read_text(tmp_path: Path) -> None:
+    path = tmp_path / "puzzle_input.txt"
+    path.write_text("abc\ndef\n")
+
+    assert read_text(str(path)) == "abc\ndef\n"
+
+
+def test_iter_lines(tmp_path: Path) -> None:
+    path = tmp_path / "puzzle_input.txt"
+    path.write_text("abc\n\ndef")
+
+    assert list(iter_lines(str(path))) == ["abc", "", "def"]
+
+
+def test_iter_chunks(tmp_path: Path) -> None:
+    path = tmp_path / "puzzle_input.txt"
+    path.write_bytes(b"abcdefg")
+
+    assert list(iter_chunks(str(path), 3)) == [b"abc", b"def", b"g"]
+
+
+def test_empty_input(tmp_path: Path) -> None:
+    path = tmp_path / "puzzle_input.txt"
+    path.write_bytes(b"")
+
+    with map_input(str(path)) as data:
+        assert data == b""
+
+    assert read_text(str(path)) == ""
+    assert list(iter_lines(str(path))) == []
+    assert list(iter_chunks(str(path))) == []
+
+
+def test_load_parsed_is_shared_between_identical_files(tmp_path: Path) -> None:
+    parse_calls = []
+
+    def parse(text: str) -> list[str]:
+        parse_calls.append(text)
+        return text.split(",")
+
+    first_path = tmp_path / "first.txt"
+    second_path = tmp_path / "second.txt"
+    first_path.write_text("1,2,3")
+    second_path.write_text("1,2,3")
+
+    assert load_parsed(str(first_path), parse) == ["1", "2", "3"]
+    assert load_parsed(str(second_path), parse) is load_parsed(str(first_path), parse)
+    assert get_input_hash(str(first_path)) == get_input_hash(str(second_path))
+    assert parse_calls == ["1,2,3"]
+
+
+def test_rewritten_file_is_read_again(tmp_path: Path) -> None:
+    path = tmp_path / "puzzle_input.txt"
+    path.write_text("1,2,3")
+    first_hash = get_input_hash(str(path))
+
+    assert read_text(str(path)) == "1,2,3"
+    assert load_parsed(str(path), str.split) == ["1,2,3"]
+
+    path.write_text("4,5,6,7")
+
+    assert get_input_hash(str(path)) != first_hash
+    assert read_text(str(path)) == "4,5,6,7"
+    assert load_parsed(str(path), str.split) == ["4,5,6,7"]
+
+
+def test_map_input_is_closed_on_exit(tmp_path: Path) -> None:
+    path = tmp_path / "puzzle_input.txt"
+    path.write_text("abc")
+
+    with map_input(str(path)) as data:
+        assert data[:] == b"abc"
+
+    assert isinstance(data, mmap)
+    assert data.closed